@@ -0,0 +1,120 @@
+import argparse
+import os
+import random
+
+WORDS = (
+    "ring hobbit wizard elf dwarf river mountain shire road shadow light tower "
+    "forest king sword song star council journey fellowship ranger"
+).split()
+
+def inline_text(rng, words, density) -> str:
+    parts = []
+
+    for index in range(words):
+        word = rng.choice(WORDS)
+
+        if rng.random() < density:
+            match rng.randrange(5):
+                case 0:
+                    word = f"**{word}**"
+                case 1:
+                    word = f"*{word}*"
+                case 2:
+                    word = f"`{word}`"
+                case 3:
+                    word = f"[{word}](/{rng.choice(WORDS)}/{index})"
+                case 4:
+                    word = f"![{word}](/images/{rng.choice(WORDS)}.png)"
+
+        parts.append(word)
+
+    return " ".join(parts)
+
+def generate_block(rng, block_mix, list_length, density) -> str:
+    block_type = rng.choices(list(block_mix), weights=list(block_mix.values()))[0]
+
+    match block_type:
+        case "heading":
+            return f"{'#' * rng.randint(2, 6)} {inline_text(rng, 4, density)}"
+        case "code":
+            lines = "\n".join(f"    {rng.choice(WORDS)}({rng.choice(WORDS)})" for _ in range(rng.randint(2, 8)))
+            return f"```python\n{lines}\n```"
+        case "quote":
+            return "\n".join(f"> {inline_text(rng, 10, density)}" for _ in range(rng.randint(1, 3)))
+        case "unordered_list":
+            return "\n".join(f"- {inline_text(rng, 6, density)}" for _ in range(list_length))
+        case "ordered_list":
+            return "\n".join(f"{n + 1}. {inline_text(rng, 6, density)}" for n in range(list_length))
+        case _:
+            return "\n".join(inline_text(rng, 16, density) for _ in range(rng.randint(1, 4)))
+
+DEFAULT_BLOCK_MIX = {
+    "heading": 2,
+    "paragraph": 6,
+    "code": 1,
+    "quote": 1,
+    "unordered_list": 1,
+    "ordered_list": 1,
+}
+
+def generate_document(rng, blocks=40, block_mix=DEFAULT_BLOCK_MIX, list_length=8, density=0.1) -> str:
+    body = [generate_block(rng, block_mix, list_length, density) for _ in range(blocks)]
+
+    return "\n\n".join([f"# {inline_text(rng, 5, 0)}", *body]) + "\n"
+
+def generate_corpus(pages=100, seed=0, **options) -> dict[str, str]:
+    rng = random.Random(seed)
+
+    # Spread pages over a few levels of directories, like a real site
+    return {
+        os.path.join(f"section-{index % 10}", f"part-{index % 7}", f"page-{index}.md"):
+            generate_document(rng, **options)
+        for index in range(pages)
+    }
+
+def write_corpus(directory, corpus):
+    for path, markdown in corpus.items():
+        full_path = os.path.join(directory, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        with open(full_path, "w") as f:
+            f.write(markdown)
+
+def parse_block_mix(value) -> dict[str, int]:
+    mix = dict(map(lambda pair: (pair[0], int(pair[1])), (item.split("=") for item in value.split(","))))
+
+    unknown = set(mix) - set(DEFAULT_BLOCK_MIX)
+
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown block types: {', '.join(sorted(unknown))}")
+
+    return mix
+
+def add_corpus_arguments(parser):
+    parser.add_argument("--pages", type=int, default=200, help="number of pages to generate")
+    parser.add_argument("--blocks", type=int, default=40, help="blocks per page")
+    parser.add_argument("--block-mix", type=parse_block_mix, default=DEFAULT_BLOCK_MIX, help="weights, e.g. paragraph=6,code=1")
+    parser.add_argument("--list-length", type=int, default=8, help="items per list block")
+    parser.add_argument("--density", type=float, default=0.1, help="fraction of words carrying inline markup")
+    parser.add_argument("--seed", type=int, default=0, help="random seed; the same seed gives the same corpus")
+
+def corpus_options(args) -> dict:
+    return {
+        "pages": args.pages,
+        "seed": args.seed,
+        "blocks": args.blocks,
+        "block_mix": args.block_mix,
+        "list_length": args.list_length,
+        "density": args.density,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic markdown corpus")
+    parser.add_argument("directory", help="content directory to write the corpus into")
+    add_corpus_arguments(parser)
+    args = parser.parse_args(argv)
+
+    write_corpus(args.directory, generate_corpus(**corpus_options(args)))
+
+if __name__ == "__main__":
+    main()
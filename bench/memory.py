@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+def build_text_nodes(count):
+    return [TextNode("text", TextType.TEXT) for _ in range(count)]
+
+def build_leaf_nodes(count):
+    return [LeafNode("b", "text") for _ in range(count)]
+
+def build_parent_nodes(count):
+    child = LeafNode(None, "text")
+    return [ParentNode(f"h{i % 6 + 1}", [child]) for i in range(count)]
+
+def measure(builder, count) -> float:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    nodes = builder(count)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Exclude the list holding the nodes from the per-node figure
+    return (after - before - sys.getsizeof(nodes)) / count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the per-instance memory footprint of node classes")
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    for name, builder in [
+        ("TextNode", build_text_nodes),
+        ("LeafNode", build_leaf_nodes),
+        ("ParentNode", build_parent_nodes),
+    ]:
+        print(f"{name:<12}{measure(builder, args.count):>8.1f} bytes/node")
+
+if __name__ == "__main__":
+    main()
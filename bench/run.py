@@ -0,0 +1,149 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import add_corpus_arguments, corpus_options, generate_corpus, write_corpus
+import main as site
+from orchestration import block_to_html_node, markdown_to_blocks, markdown_to_html_node, text_to_textnodes, tokenize_block
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template.html")
+
+def timed(function, repeat) -> dict:
+    samples = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+
+    return {"min": min(samples), "median": statistics.median(samples), "samples": samples}
+
+def inline_texts(blocks) -> list[str]:
+    texts = []
+
+    for token in map(tokenize_block, blocks):
+        match token.block_type:
+            case "unordered_list" | "ordered_list":
+                texts.extend(token.content)
+            case "code":
+                pass
+            case _:
+                texts.append(token.content)
+
+    return texts
+
+def run_stages(corpus, repeat, jobs) -> dict:
+    documents = list(corpus.values())
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    texts = inline_texts(blocks)
+    trees = [markdown_to_html_node(document) for document in documents]
+    pages = [tree.to_html() for tree in trees]
+
+    with tempfile.TemporaryDirectory() as directory:
+        def file_io():
+            for index, page in enumerate(pages):
+                path = os.path.join(directory, f"{index}.html")
+
+                with open(path, "w") as f:
+                    f.write(page)
+
+                with open(path, "r") as f:
+                    f.read()
+
+        def full_build():
+            shutil.rmtree(os.path.join(directory, ".cache"), ignore_errors=True)
+            cwd = os.getcwd()
+            os.chdir(directory)
+
+            try:
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    site.main(["--jobs", str(jobs)])
+            finally:
+                os.chdir(cwd)
+
+        write_corpus(os.path.join(directory, "content"), corpus)
+        os.makedirs(os.path.join(directory, "static"))
+        shutil.copy(TEMPLATE, os.path.join(directory, "template.html"))
+
+        return {
+            "markdown_to_blocks": timed(lambda: [markdown_to_blocks(document) for document in documents], repeat),
+            "block_to_html_node": timed(lambda: [block_to_html_node(block) for block in blocks], repeat),
+            "text_to_textnodes": timed(lambda: [text_to_textnodes(text) for text in texts], repeat),
+            "to_html": timed(lambda: [tree.to_html() for tree in trees], repeat),
+            "file_io": timed(file_io, repeat),
+            "main": timed(full_build, repeat),
+        }
+
+def compare(baseline, results, threshold) -> list[str]:
+    regressions = []
+    print(f"{'stage':<20}{'baseline':>13}{'current':>13}{'change':>9}")
+
+    for stage, result in results["stages"].items():
+        previous = baseline["stages"].get(stage)
+
+        if not previous:
+            continue
+
+        change = (result["min"] - previous["min"]) / previous["min"]
+        marker = ""
+
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions.append(stage)
+
+        print(f"{stage:<20}{previous['min'] * 1000:>10.2f} ms{result['min'] * 1000:>10.2f} ms{change:>+9.1%}{marker}")
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each build stage over a synthetic corpus")
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage; the minimum is reported")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for the full main() build")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    options = corpus_options(args)
+    results = {
+        "corpus": options,
+        "repeat": args.repeat,
+        "jobs": args.jobs,
+        "python": platform.python_version(),
+        "stages": run_stages(generate_corpus(**options), args.repeat, args.jobs),
+    }
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+
+        if baseline["corpus"] != results["corpus"]:
+            print("warning: baseline was measured on a different corpus")
+
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+    else:
+        for stage, result in results["stages"].items():
+            print(f"{stage:<20}{result['min'] * 1000:>10.2f} ms")
+
+if __name__ == "__main__":
+    main()
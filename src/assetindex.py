@@ -0,0 +1,169 @@
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from links import asset_url
+from manifest import hash_file
+
+# JPEG markers that carry no length, and start-of-frame markers that carry the size
+JPEG_STANDALONE_MARKERS = frozenset([0x01, *range(0xD0, 0xDA)])
+JPEG_FRAME_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def png_size(header) -> tuple[int, int] | None:
+    if header[12:16] != b"IHDR":
+        return None
+
+    return struct.unpack(">II", header[16:24])
+
+def gif_size(header) -> tuple[int, int] | None:
+    return struct.unpack("<HH", header[6:10])
+
+def webp_size(header) -> tuple[int, int] | None:
+    match header[12:16]:
+        case b"VP8 ":
+            width, height = struct.unpack("<HH", header[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        case b"VP8L":
+            bits = int.from_bytes(header[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        case b"VP8X":
+            return int.from_bytes(header[24:27], "little") + 1, int.from_bytes(header[27:30], "little") + 1
+
+    return None
+
+def jpeg_size(f) -> tuple[int, int] | None:
+    f.seek(2)
+
+    # Walk the segment headers up to the first frame, seeking over every payload
+    while True:
+        byte = f.read(1)
+
+        while byte == b"\xff":
+            byte = f.read(1)
+
+        if not byte:
+            return None
+
+        marker = byte[0]
+
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+
+        length_bytes = f.read(2)
+
+        if len(length_bytes) < 2:
+            return None
+
+        length = struct.unpack(">H", length_bytes)[0]
+
+        if marker in JPEG_FRAME_MARKERS:
+            frame = f.read(5)
+
+            if len(frame) < 5:
+                return None
+
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+
+        f.seek(length - 2, os.SEEK_CUR)
+
+        # The byte after a segment must start the next marker
+        if f.read(1) != b"\xff":
+            return None
+
+def read_image_size(f) -> tuple[int, int] | None:
+    header = f.read(30)
+
+    if len(header) < 24:
+        return None
+
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return png_size(header)
+
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return gif_size(header)
+
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP" and len(header) == 30:
+        return webp_size(header)
+
+    if header[:2] == b"\xff\xd8":
+        return jpeg_size(f)
+
+    return None
+
+def image_size(path) -> tuple[int, int] | None:
+    # Only the header is read, never the pixel data
+    with open(path, "rb") as f:
+        return read_image_size(f)
+
+def describe_asset(path) -> dict:
+    size = image_size(path)
+
+    return {
+        "digest": hash_file(path),
+        "width": size[0] if size else None,
+        "height": size[1] if size else None,
+    }
+
+def index_assets(static_dir, assets, previous=None, jobs=1) -> dict:
+    previous = previous or {}
+    index = {}
+    stale = []
+
+    # Assets whose size and mtime are unchanged keep what was read from them last build
+    for asset in assets:
+        path = asset.path
+        entry = {"size": asset.stat.st_size, "mtime": asset.stat.st_mtime_ns}
+        previous_entry = previous.get(path)
+
+        if previous_entry and previous_entry["size"] == entry["size"] and previous_entry["mtime"] == entry["mtime"]:
+            entry = previous_entry
+        else:
+            stale.append(path)
+
+        index[path] = entry
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        descriptions = executor.map(describe_asset, (os.path.join(static_dir, path) for path in stale))
+
+        for path, description in zip(stale, descriptions):
+            index[path].update(description)
+
+    return index
+
+def find_duplicates(index) -> list[list[str]]:
+    copies = {}
+
+    for path, entry in sorted(index.items()):
+        if entry["width"] is not None:
+            copies.setdefault(entry["digest"], []).append(path)
+
+    return [paths for paths in copies.values() if len(paths) > 1]
+
+def duplicate_urls(duplicates) -> dict[str, str]:
+    return {asset_url(path): asset_url(canonical) for canonical, *copies in duplicates for path in copies}
+
+def link_duplicates(public_dir, duplicates) -> dict[str, str]:
+    for canonical, *copies in duplicates:
+        source = os.path.join(public_dir, canonical)
+
+        for path in copies:
+            destination = os.path.join(public_dir, path)
+
+            if os.path.samefile(source, destination):
+                continue
+
+            # Link beside the copy and rename over it, so the copy is never missing
+            print(f"Linking {destination} to {source}")
+            temporary_path = f"{destination}.link"
+            os.link(source, temporary_path)
+            os.replace(temporary_path, destination)
+
+    return duplicate_urls(duplicates)
+
+def print_duplicates(duplicates):
+    print(f"{sum(len(paths) - 1 for paths in duplicates)} duplicate image(s):")
+
+    for canonical, *copies in duplicates:
+        for path in copies:
+            print(f"  {path} is a copy of {canonical}")
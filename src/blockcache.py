@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import tempfile
+
+class BlockCache():
+    __slots__ = ("directory", "max_bytes", "version", "min_block_size", "minify")
+
+    def __init__(self, directory, max_bytes, version, min_block_size=256, minify=False) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_block_size = min_block_size
+        # Part of every key, so a new generator never sees fragments rendered by an old one
+        self.version = version
+        # Fragments are stored serialized, so minified and plain ones are kept apart
+        self.minify = minify
+
+    def key(self, block) -> str:
+        return hashlib.sha256(f"{self.version}\0{self.minify:d}\0{block}".encode()).hexdigest()
+
+    def path(self, key) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, block) -> dict | None:
+        path = self.path(self.key(block))
+
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # The mtime doubles as the last-used time for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return entry
+
+    def put(self, block, entry: dict):
+        path = self.path(self.key(block))
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write then rename so parallel workers never read a partial entry
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+
+        with os.fdopen(descriptor, "w") as f:
+            json.dump(entry, f)
+
+        os.replace(temporary_path, path)
+
+    def entries(self) -> list[tuple[int, int, str]]:
+        entries = []
+
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        return entries
+
+    def evict(self) -> int:
+        entries = sorted(self.entries())
+        size = sum(entry[1] for entry in entries)
+        evicted = 0
+
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            size -= entry_size
+            evicted += 1
+
+        return evicted
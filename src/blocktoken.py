@@ -0,0 +1,23 @@
+class BlockToken():
+    __slots__ = ("block_type", "content", "level", "language")
+
+    def __init__(self, block_type, content, level = None, language = None) -> None:
+        self.block_type: str = block_type
+        # A string for text blocks, a list of item strings for lists
+        self.content: str | list[str] = content
+        self.level: int | None = level
+        self.language: str | None = language
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, self.__class__):
+            return False
+
+        return (
+            self.block_type == other.block_type and
+            self.content == other.content and
+            self.level == other.level and
+            self.language == other.language
+        )
+
+    def __repr__(self) -> str:
+        return f"BlockToken(\"{self.block_type}\", {self.content!r}, {self.level}, {self.language})"
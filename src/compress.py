@@ -0,0 +1,89 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from outputs import write_if_changed
+from sync import remove_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".svg", ".json")
+COMPRESSED_EXTENSIONS = (".gz", ".br")
+
+def gzip_bytes(data: bytes) -> bytes:
+    # A fixed header mtime keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def brotli_bytes(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+def encoders() -> dict:
+    available = {".gz": gzip_bytes}
+
+    if brotli:
+        available[".br"] = brotli_bytes
+
+    return available
+
+def compressed_source(path) -> str | None:
+    root, extension = os.path.splitext(path)
+
+    if extension in COMPRESSED_EXTENSIONS and root.endswith(COMPRESSIBLE_EXTENSIONS):
+        return root
+
+    return None
+
+def compress_file(source, encoders) -> list[tuple[str, str]]:
+    source_stat = os.stat(source)
+    statuses = []
+    data = None
+
+    for extension, encode in encoders.items():
+        sibling = source + extension
+
+        # Siblings carry their source's mtime, and outputs whose bytes did not
+        # change keep theirs, so a matching mtime means there is nothing to do
+        try:
+            if os.stat(sibling).st_mtime_ns == source_stat.st_mtime_ns:
+                statuses.append((sibling, "unchanged"))
+                continue
+        except FileNotFoundError:
+            pass
+
+        if data is None:
+            with open(source, "rb") as f:
+                data = f.read()
+
+        compressed = encode(data)
+        statuses.append((sibling, write_if_changed(sibling, lambda f: f.write(compressed), "wb")))
+        os.utime(sibling, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+
+    return statuses
+
+def precompress_tree(directory, files, jobs=1, changes=None):
+    available = encoders()
+    present = set(files)
+    sources = []
+
+    for path in files:
+        source = compressed_source(path)
+
+        if source is None:
+            if path.endswith(COMPRESSIBLE_EXTENSIONS):
+                sources.append(os.path.join(directory, path))
+        elif source not in present or os.path.splitext(path)[1] not in available:
+            # The page or asset it was made from is gone, or the encoder is no longer installed
+            remove_file(directory, path)
+
+            if changes is not None:
+                changes.record(os.path.join(directory, path), "removed")
+
+    # zlib and brotli release the GIL, so threads compress in parallel
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for statuses in executor.map(lambda source: compress_file(source, available), sources):
+            if changes is not None:
+                for sibling, status in statuses:
+                    changes.record(sibling, status)
@@ -0,0 +1,79 @@
+import os
+from fnmatch import fnmatchcase
+
+# Editor backups, swap and lock files are never part of the site
+DEFAULT_IGNORE = ("*~", "*.swp", "*.swo", "#*#", ".#*", ".DS_Store")
+
+class FileEntry():
+    __slots__ = ("path", "stat")
+
+    def __init__(self, path, stat: os.stat_result) -> None:
+        # Relative to the root that was scanned
+        self.path = path
+        self.stat = stat
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FileEntry):
+            return False
+
+        return self.path == other.path and self.stat == other.stat
+
+    def __repr__(self) -> str:
+        return f"FileEntry({self.path}, {self.stat.st_size}, {self.stat.st_mtime_ns})"
+
+class SiteFiles():
+    __slots__ = ("pages", "assets")
+
+    def __init__(self, pages: list[FileEntry], assets: list[FileEntry]) -> None:
+        self.pages = pages
+        self.assets = assets
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SiteFiles):
+            return False
+
+        return self.pages == other.pages and self.assets == other.assets
+
+    def __repr__(self) -> str:
+        return f"SiteFiles({self.pages}, {self.assets})"
+
+def is_ignored(path, ignore) -> bool:
+    # A pattern matches either one path component, like "*.swp", or the whole relative path, like "drafts/*"
+    name = os.path.basename(path)
+    posix_path = path.replace(os.sep, "/")
+
+    return any(fnmatchcase(name, pattern) or fnmatchcase(posix_path, pattern) for pattern in ignore)
+
+def scan_directory(root, directory, ignore, entries):
+    with os.scandir(os.path.join(root, directory)) as it:
+        children = sorted(it, key=lambda entry: entry.name)
+
+    for entry in children:
+        path = os.path.join(directory, entry.name)
+
+        if is_ignored(path, ignore):
+            continue
+
+        # scandir already knows each entry's type, and its stat is fetched once
+        # and handed on so no later stage has to stat the file again
+        if entry.is_dir():
+            scan_directory(root, path, ignore, entries)
+        elif entry.is_file():
+            try:
+                entries.append(FileEntry(path, entry.stat()))
+            except FileNotFoundError:
+                # Deleted between listing the directory and reading the entry
+                pass
+
+def scan_tree(root, ignore=DEFAULT_IGNORE) -> list[FileEntry]:
+    entries = []
+
+    if os.path.isdir(root):
+        scan_directory(root, "", ignore, entries)
+
+    return entries
+
+def discover(content_dir, static_dir, ignore=DEFAULT_IGNORE) -> SiteFiles:
+    pages = [entry for entry in scan_tree(content_dir, ignore) if entry.path.endswith(".md")]
+
+    return SiteFiles(pages, scan_tree(static_dir, ignore))
@@ -0,0 +1,49 @@
+import os
+
+from links import asset_url
+from sync import remove_file, transfer
+
+FINGERPRINT_LENGTH = 12
+
+def fingerprinted_path(path, digest) -> str:
+    root, extension = os.path.splitext(path)
+
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{extension}"
+
+def url_path(url) -> str:
+    return url.removeprefix("/").replace("/", os.sep)
+
+def fingerprint_urls(asset_index) -> dict[str, str]:
+    return {asset_url(path): asset_url(fingerprinted_path(path, entry["digest"])) for path, entry in asset_index.items()}
+
+def fingerprint_assets(static_dir, public_dir, asset_index, previous_urls=None, link_mode="copy", changes=None) -> dict[str, str]:
+    previous_urls = previous_urls or {}
+    urls = {}
+
+    for path, entry in asset_index.items():
+        fingerprinted = fingerprinted_path(path, entry["digest"])
+        destination = os.path.join(public_dir, fingerprinted)
+
+        # The name is derived from the content, so an existing file is already correct
+        if os.path.exists(destination):
+            status = "unchanged"
+        else:
+            status = "added"
+            print(f"Fingerprinting {os.path.join(static_dir, path)} as {destination}")
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            transfer(os.path.join(static_dir, path), destination, link_mode)
+
+        if changes is not None:
+            changes.record(destination, status)
+
+        urls[asset_url(path)] = asset_url(fingerprinted)
+
+    current = set(urls.values())
+
+    for url in set(previous_urls.values()) - current:
+        remove_file(public_dir, url_path(url))
+
+        if changes is not None:
+            changes.record(os.path.join(public_dir, url_path(url)), "removed")
+
+    return urls
@@ -0,0 +1,96 @@
+from datetime import date
+from itertools import chain
+from typing import Iterable, Iterator
+
+FENCE = "---"
+BOOLEANS = {"true": True, "yes": True, "false": False, "no": False}
+
+def unquote(value) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+
+    return value
+
+def parse_tags(value) -> list[str]:
+    # Both "a, b" and the YAML flow form "[a, b]"
+    if value.startswith("[") and value.endswith("]"):
+        value = value[1:-1]
+
+    return [unquote(tag.strip()) for tag in value.split(",") if tag.strip()]
+
+def parse_value(key, value):
+    match key:
+        case "tags":
+            return parse_tags(value)
+        case "draft":
+            if value.lower() not in BOOLEANS:
+                raise ValueError(f"Front matter draft must be true or false: {value}")
+
+            return BOOLEANS[value.lower()]
+        case "date":
+            value = unquote(value)
+
+            try:
+                return date.fromisoformat(value).isoformat()
+            except ValueError:
+                raise ValueError(f"Front matter date must be YYYY-MM-DD: {value}")
+
+    return unquote(value)
+
+def parse_front_matter(lines: Iterable[str]) -> dict:
+    metadata = {}
+
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+
+        key, separator, value = line.partition(":")
+
+        if not separator or not key.strip():
+            raise ValueError(f"Invalid front matter line: {line.strip()}")
+
+        metadata[key.strip().lower()] = parse_value(key.strip().lower(), value.strip())
+
+    return metadata
+
+def page_metadata(front_matter, title) -> dict:
+    # The fields every entry of the metadata index has, whether or not the page set them
+    return {
+        **front_matter,
+        "title": title,
+        "date": front_matter.get("date"),
+        "tags": front_matter.get("tags", []),
+        "draft": front_matter.get("draft", False),
+        "template": front_matter.get("template"),
+    }
+
+def template_values(metadata) -> dict[str, str]:
+    # Each field fills the template slot of the same name, so "date" fills {{ Date }}
+    values = {}
+
+    for key, value in metadata.items():
+        if key in ("draft", "template") or value is None:
+            continue
+
+        values[key.capitalize()] = ", ".join(value) if isinstance(value, list) else str(value)
+
+    return values
+
+def read_front_matter(lines: Iterable[str]) -> tuple[dict, Iterator[str]]:
+    # Only the fenced header is consumed, so the rest of the lines can go
+    # straight on to block splitting without the source being read twice
+    lines = iter(lines)
+    first = next(lines, "")
+
+    if first.strip() != FENCE:
+        return {}, chain([first], lines)
+
+    header = []
+
+    for line in lines:
+        if line.strip() == FENCE:
+            return parse_front_matter(header), lines
+
+        header.append(line)
+
+    raise ValueError("Unterminated front matter")
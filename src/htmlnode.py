@@ -1,26 +1,54 @@
-from functools import reduce
+import re
+import sys
+from types import MappingProxyType
+from typing import Iterator, Mapping, TextIO
+
+# Shared by every node without attributes or children instead of allocating one per node
+EMPTY_PROPS: Mapping[str, str] = MappingProxyType({})
+NO_CHILDREN: tuple = ()
+# Values that HTML allows without quotes
+unquoted_value_regex = re.compile(r"[^\s\"'=<>`]+")
+# Elements that never have content, so a minified end tag is omitted
+VOID_TAGS = frozenset(["img", "br", "hr"])
 
 
 class HTMLNode():
-    def __init__(self, tag: str | None, value: str | None, children: list, props: dict = {}):
-        self.tag = tag
+    __slots__ = ("tag", "value", "children", "props")
+
+    def __init__(self, tag: str | None, value: str | None, children: list, props: Mapping[str, str] | None = None):
+        self.tag = sys.intern(tag) if tag else tag
         self.value = value
         self.children = children
-        self.props = props
+        self.props = props or EMPTY_PROPS
+
+    def to_html(self, minify=False) -> str:
+        return "".join(self.iter_html(minify))
 
-    def to_html(self) -> str:
+    def iter_html(self, minify=False) -> Iterator[str]:
         raise NotImplementedError()
 
-    def props_to_html(self) -> str:
-        return reduce(lambda acc, item: acc + f" {item[0]}=\"{item[1]}\"", self.props.items(), "")
+    def write_to(self, f: TextIO, minify=False):
+        f.writelines(self.iter_html(minify))
+
+    def props_to_html(self, minify=False) -> str:
+        if minify:
+            return "".join(
+                f" {key}={value}" if unquoted_value_regex.fullmatch(value) else f" {key}=\"{value}\""
+                for key, value in self.props.items()
+            )
+
+        return "".join(f" {key}=\"{value}\"" for key, value in self.props.items())
 
-    def start_tag_html(self) -> str:
+    def start_tag_html(self, minify=False) -> str:
         if self.props:
-            return f"<{self.tag}{self.props_to_html()}>"
+            return f"<{self.tag}{self.props_to_html(minify)}>"
         else:
             return f"<{self.tag}>"
 
-    def end_tag_html(self) -> str:
+    def end_tag_html(self, minify=False) -> str:
+        if minify and self.tag in VOID_TAGS:
+            return ""
+
         return f"</{self.tag}>"
 
     def __eq__(self, other: object) -> bool:
@@ -30,32 +58,40 @@ class HTMLNode():
         return self.tag == other.tag and self.value == other.value and self.children == other.children
 
     def __repr__(self) -> str:
-        return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
+        return f"HTMLNode({self.tag}, {self.value}, {self.children}, {dict(self.props)})"
 
 class LeafNode(HTMLNode):
-    def __init__(self, tag: str | None, value: str, props: dict = {}):
-        super().__init__(tag, value, [], props)
+    __slots__ = ()
+
+    def __init__(self, tag: str | None, value: str, props: Mapping[str, str] | None = None):
+        super().__init__(tag, value, NO_CHILDREN, props)
 
-    def to_html(self) -> str:
+    def iter_html(self, minify=False) -> Iterator[str]:
         if self.value or self.value == '':
             if self.tag:
-                return f"{self.start_tag_html()}{self.value}{self.end_tag_html()}"
+                # Text is written as is, so code and preformatted content is never altered
+                yield f"{self.start_tag_html(minify)}{self.value}{self.end_tag_html(minify)}"
             else:
-                return self.value
+                yield self.value
         else:
             raise ValueError("All leaf nodes must have a value")
 
 class ParentNode(HTMLNode):
-    def __init__(self, tag: str, children: list, props: dict = {}):
+    __slots__ = ()
+
+    def __init__(self, tag: str, children: list, props: Mapping[str, str] | None = None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self) -> str:
+    def iter_html(self, minify=False) -> Iterator[str]:
         if not self.tag:
             raise ValueError("Must have a tag")
 
         if not self.children:
             raise ValueError("Must have children")
 
-        children_html =  reduce(lambda acc, n: acc + n.to_html(), self.children, "")
+        yield self.start_tag_html(minify)
+
+        for child in self.children:
+            yield from child.iter_html(minify)
 
-        return f"{self.start_tag_html()}{children_html}{self.end_tag_html()}"
+        yield self.end_tag_html(minify)
@@ -0,0 +1,60 @@
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+def is_internal(url) -> bool:
+    parts = urlsplit(url)
+
+    return not parts.scheme and not parts.netloc and bool(parts.path)
+
+def asset_url(path) -> str:
+    return "/" + path.replace(os.sep, "/")
+
+def page_url(to_path, public_dir) -> str:
+    relative_path = os.path.relpath(to_path, public_dir).replace(os.sep, "/")
+
+    if posixpath.basename(relative_path) == "index.html":
+        return "/" + relative_path.removesuffix("index.html")
+
+    return "/" + relative_path
+
+def resolve(url, base_url) -> str:
+    path = unquote(urlsplit(url).path)
+
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname(base_url), path)
+
+    resolved = posixpath.normpath(path)
+
+    # normpath drops the trailing slash that marks a directory
+    return resolved + "/" if path.endswith("/") and resolved != "/" else resolved
+
+def link_targets(page_outputs, assets, public_dir) -> set[str]:
+    targets = set(map(asset_url, assets))
+
+    for to_path in page_outputs:
+        url = page_url(to_path, public_dir)
+        targets.add(url)
+
+        # A directory index is also served at ".../index.html" and redirected from ".../dir"
+        if url.endswith("/"):
+            targets.add(url + "index.html")
+            targets.add(url.rstrip("/") or "/")
+
+    return targets
+
+def find_broken_links(page_links, targets) -> list[tuple[str, str]]:
+    broken = []
+
+    for from_path, (base_url, urls) in sorted(page_links.items()):
+        for url in urls:
+            if is_internal(url) and resolve(url, base_url) not in targets:
+                broken.append((from_path, url))
+
+    return broken
+
+def print_broken_links(broken):
+    print(f"{len(broken)} broken internal link(s):")
+
+    for from_path, url in broken:
+        print(f"  {from_path}: {url}")
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import re
+
+from htmlnode import LeafNode, ParentNode
+from links import page_url
+from outputs import write_if_changed
+from references import NO_ASSET_REFERENCES
+from sync import remove_file
+from template import load_template
+
+LISTING_DIR = "all"
+TAGS_DIR = "tags"
+slug_regex = re.compile(r"[^\w]+")
+
+class Listing():
+    __slots__ = ("title", "to_path", "members", "newer_url", "older_url")
+
+    def __init__(self, title, to_path, members, newer_url = None, older_url = None) -> None:
+        self.title: str = title
+        self.to_path: str = to_path
+        # (url, title, date) of each page listed here, newest first
+        self.members: list[tuple[str, str, str | None]] = members
+        self.newer_url: str | None = newer_url
+        self.older_url: str | None = older_url
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Listing):
+            return False
+
+        return (
+            self.title == other.title and
+            self.to_path == other.to_path and
+            self.members == other.members and
+            self.newer_url == other.newer_url and
+            self.older_url == other.older_url
+        )
+
+    def __repr__(self) -> str:
+        return f"Listing({self.title}, {self.to_path}, {self.members}, {self.newer_url}, {self.older_url})"
+
+    def digest(self) -> str:
+        # Everything the listing renders, so an unchanged digest means an unchanged page
+        data = [self.title, self.members, self.newer_url, self.older_url]
+
+        return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
+    def to_html_node(self) -> ParentNode:
+        items = []
+
+        for url, title, date in self.members:
+            children = [LeafNode("a", title, {"href": url})]
+
+            if date:
+                children += [LeafNode(None, " "), LeafNode("time", date, {"datetime": date})]
+
+            items.append(ParentNode("li", children))
+
+        children = [ParentNode("ul", items)]
+        links = []
+
+        if self.newer_url:
+            links.append(LeafNode("a", "Newer", {"href": self.newer_url, "rel": "prev"}))
+
+        if self.older_url:
+            links.append(LeafNode("a", "Older", {"href": self.older_url, "rel": "next"}))
+
+        if links:
+            children.append(ParentNode("nav", links))
+
+        return ParentNode("div", children)
+
+def tag_slug(tag) -> str:
+    return slug_regex.sub("-", tag.lower()).strip("-") or "-"
+
+def sort_members(members) -> list:
+    # Newest first, then the undated pages, each run in title order
+    members = sorted(members, key=lambda member: member[1])
+    dated = sorted((member for member in members if member[2]), key=lambda member: member[2], reverse=True)
+
+    return dated + [member for member in members if not member[2]]
+
+def paginate(title, directory, members, dest_dir, page_size) -> list[Listing]:
+    members = sort_members(members)
+    pages = [members[start:start + page_size] for start in range(0, len(members), page_size)]
+    listings = []
+
+    # The first page is the directory itself and later ones are numbered below it
+    for number, page in enumerate(pages, 1):
+        to_path = os.path.join(directory, str(number), "index.html") if number > 1 else os.path.join(directory, "index.html")
+        listings.append(Listing(title if number == 1 else f"{title} (page {number})", to_path, page))
+
+    for newer, older in zip(listings, listings[1:]):
+        newer.older_url = page_url(older.to_path, dest_dir)
+        older.newer_url = page_url(newer.to_path, dest_dir)
+
+    return listings
+
+def collect_listings(pages, metadata, content_dir, dest_dir, page_size=20, drafts=False) -> list[Listing]:
+    # Built from the metadata index alone, so no source is opened again
+    directories: dict[str, list] = {}
+    tags: dict[str, tuple[str, list]] = {}
+
+    for from_path, page in pages.items():
+        page_metadata = metadata.get(from_path)
+
+        if page_metadata is None or (page_metadata["draft"] and not drafts):
+            continue
+
+        member = (page_url(page["output"], dest_dir), page_metadata["title"], page_metadata["date"])
+        directory = os.path.dirname(os.path.relpath(from_path, content_dir))
+
+        # A directory lists every page below it apart from its own index
+        parents = [] if os.path.basename(from_path) == "index.md" else [directory]
+
+        while directory:
+            directory = os.path.dirname(directory)
+            parents.append(directory)
+
+        for parent in parents:
+            directories.setdefault(parent, []).append(member)
+
+        for tag in page_metadata["tags"]:
+            tags.setdefault(tag_slug(tag), (tag, []))[1].append(member)
+
+    listings = []
+
+    for directory, members in sorted(directories.items()):
+        title = directory.replace(os.sep, "/") or "All pages"
+        listings += paginate(title, os.path.join(dest_dir, directory, LISTING_DIR), members, dest_dir, page_size)
+
+    for slug, (tag, members) in sorted(tags.items()):
+        listings += paginate(f"Tagged {tag}", os.path.join(dest_dir, TAGS_DIR, slug), members, dest_dir, page_size)
+
+    outputs = set(page["output"] for page in pages.values())
+    clashes = [listing.to_path for listing in listings if listing.to_path in outputs]
+
+    if clashes:
+        raise ValueError(f"Listings would overwrite pages: {', '.join(clashes)}")
+
+    return listings
+
+def generate_listings(listings, template_path, previous, dest_dir, force=False, asset_references=NO_ASSET_REFERENCES, minify=False, changes=None) -> dict[str, str]:
+    current = {listing.to_path: listing.digest() for listing in listings}
+
+    # Listings own their directories, so emptied ones go with them
+    for to_path in previous:
+        if to_path not in current and os.path.exists(to_path):
+            remove_file(dest_dir, os.path.relpath(to_path, dest_dir))
+
+            if changes is not None:
+                changes.record(to_path, "removed")
+
+    template = load_template(template_path, minify)
+
+    for listing in listings:
+        to_path = listing.to_path
+
+        # Only listings whose members, order or neighbours changed are written
+        if not force and previous.get(to_path) == current[to_path] and os.path.exists(to_path):
+            status = "unchanged"
+        else:
+            print(f"Generating listing {to_path}")
+            references = asset_references.for_page(to_path)
+            values = {"Title": listing.title, "Content": references.rewrite_node(listing.to_html_node())}
+            status = write_if_changed(to_path, lambda f: template.render_to(f, values, references.rewrite))
+
+        if changes is not None:
+            changes.record(to_path, status)
+
+    return current
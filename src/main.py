@@ -1,81 +1,713 @@
+import argparse
 import os
-import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
 
-from orchestration import extract_title, markdown_to_html_node
+from assetindex import duplicate_urls, find_duplicates, index_assets, link_duplicates, print_duplicates
+from blockcache import BlockCache
+from compress import compressed_source, precompress_tree
+from discovery import DEFAULT_IGNORE, discover, scan_tree
+from fingerprint import fingerprint_assets, fingerprint_urls
+from frontmatter import page_metadata, template_values
+from listings import collect_listings, generate_listings
+from links import asset_url, find_broken_links, link_targets, page_url, print_broken_links
+from manifest import empty_manifest, generator_version, hash_file, inputs_changed, load_manifest, removed_outputs, save_manifest, stale_pages
+from orchestration import StreamingContent, block_title, split_page
+from outputs import OutputChanges, save_changes, write_if_changed
+from pageindex import PageIndex
+from pagerender import failed_pages_error, is_unpublished, page_template_path, prepare_page
+from profiling import NO_PROFILE, NullProfile, PageProfile, build_report, print_report, save_report
+from references import NO_ASSET_REFERENCES, AssetReferences
+from search import SEARCH_DIR, build_search_index, write_search_index
+from shards import in_shard, parse_shard, shard_manifest, shard_manifest_path
+from sync import LINK_MODES, list_files, sync_tree
+from template import hash_template, load_template
 
-def copy(paths, current_path, destination):
-    for path in paths:
-        fully_qualified_path = os.path.join(current_path, path)
+MANIFEST_PATH = os.path.join(".cache", "build-manifest.json")
+PROFILE_PATH = os.path.join(".cache", "profile.json")
+BLOCK_CACHE_PATH = os.path.join(".cache", "blocks")
+DEPLOY_MANIFEST_PATH = os.path.join(".cache", "deploy-manifest.json")
 
-        if os.path.isdir(fully_qualified_path):
-            copy(os.listdir(fully_qualified_path), fully_qualified_path, destination)
-        else:
-            fully_qualified_destination = os.path.join(destination, *fully_qualified_path.split("/")[1:])
-            os.mkdir(os.path.dirname(fully_qualified_destination))
-            shutil.copy(fully_qualified_path, fully_qualified_destination)
+def read_source(from_path, profile=NO_PROFILE) -> str:
+    with profile.stage("read"):
+        with open(from_path, "r") as f:
+            return f.read()
 
+def page_template_hash(template_path, metadata, hashes) -> str | None:
+    if not metadata.get("template"):
+        return None
 
-def clear_directory(directory):
-    if os.path.exists(directory):
-        shutil.rmtree(directory)
+    path = page_template_path(template_path, metadata)
 
-def generate_page(from_path, to_path, template_path):
+    # Many pages share a template, so each one is hashed once per build
+    if path not in hashes:
+        hashes[path] = hash_template(path) if os.path.exists(path) else None
+
+    return hashes[path]
+
+def remove_draft_output(to_path) -> str | None:
+    # A page that became a draft takes its published output down with it
+    if os.path.exists(to_path):
+        print(f"Removing draft {to_path}")
+        os.remove(to_path)
+        return "removed"
+
+    return None
+
+def write_text(to_path, text, profile=NO_PROFILE) -> str:
+    with profile.stage("write"):
+        status = write_if_changed(to_path, lambda f: f.write(text))
+
+    if profile.enabled:
+        profile.bytes_out = os.path.getsize(to_path)
+
+    return status
+
+def render_source(markdown, from_path, to_path, template_path, options, profile=NO_PROFILE, index=None) -> str | None:
+    # Everything between reading a source and writing its page, so the direct and
+    # overlapped paths differ only in how they do those two. None means a draft.
     print(f"Generating page from {from_path} to {to_path} using {template_path}")
 
-    markdown = open(from_path, "r").read()
-    page = open(template_path, "r").read()
-    title = extract_title(markdown)
-    content = markdown_to_html_node(markdown).to_html()
-    page = page.replace("{{ Title }}", title)
-    page = page.replace("{{ Content }}", content)
-
-    with open(to_path, "w") as f:
-        f.write(page)
-
-def generate_pages(dir_path_content, template_path, dest_dir_path, current_path):
-    for path in dir_path_content:
-        from_path = os.path.join(current_path, path)
-
-        if os.path.isdir(from_path):
-            generate_pages(
-                os.listdir(from_path),
-                template_path,
-                dest_dir_path,
-                from_path,
-            )
-        else:
-            to_path = os.path.join(
-                dest_dir_path,
-                *from_path.split("/")[1:]
-            )
+    references = options.asset_references.for_page(to_path)
+    prepared = prepare_page(
+        markdown, template_path, profile, options.block_cache, index, options.minify, options.drafts, references
+    )
+
+    if prepared is None:
+        return None
+
+    template, values = prepared
+
+    # The page is buffered, so serialization and writing are timed apart
+    with profile.stage("serialize"):
+        return template.render(values, references.rewrite)
+
+def generate_page(from_path, to_path, template_path, options, profile=NO_PROFILE, index=None) -> str | None:
+    page = render_source(read_source(from_path, profile), from_path, to_path, template_path, options, profile, index)
+
+    if page is None:
+        return remove_draft_output(to_path)
+
+    return write_text(to_path, page, profile)
+
+def generate_page_streaming(from_path, to_path, template_path, options, profile=NO_PROFILE, index=None) -> str | None:
+    print(f"Streaming page from {from_path} to {to_path} using {template_path}")
+
+    with open(from_path, "r") as f:
+        front_matter, blocks = split_page(f)
+        leading_blocks = []
+        title = front_matter.get("title")
+
+        # The title is written before the content, so unless the front matter
+        # gives it, read ahead only as far as the block holding it
+        with profile.stage("extract_title"):
+            if title is None:
+                for block in blocks:
+                    leading_blocks.append(block)
+                    title = block_title(block)
+
+                    if title is not None:
+                        break
+                else:
+                    raise ValueError("Missing title from markdown document")
+
+        metadata = page_metadata(front_matter, title)
 
-            to_dir = os.path.dirname(to_path)
+        if index is not None:
+            index.title = title
+            index.metadata = metadata
 
-            if not os.path.exists(to_dir):
-                os.mkdir(to_dir)
+        if is_unpublished(metadata, options.drafts):
+            return remove_draft_output(to_path)
 
-            if to_path.endswith(".md"):
-                to_path = to_path.replace(".md", ".html")
+        template = load_template(page_template_path(template_path, metadata), options.minify)
 
-            generate_page(
-                from_path,
-                to_path,
-                template_path
+        if template.slots.count("Content") != 1:
+            raise ValueError("Streamed pages need exactly one {{ Content }} slot in the template")
+
+        references = options.asset_references.for_page(to_path)
+        content = StreamingContent(chain(leading_blocks, blocks), profile, options.block_cache, index, references)
+        values = {**template_values(metadata), "Content": content}
+
+        with profile.stage("stream"):
+            status = write_if_changed(
+                to_path, lambda out: template.render_to(out, values, references.rewrite)
             )
 
-def main():
-    clear_directory("public")
-    copy(
-        os.listdir("static"),
-        "static",
-        "public"
+    if profile.enabled:
+        profile.bytes_out = os.path.getsize(to_path)
+
+    return status
+
+def should_stream(from_path, options) -> bool:
+    return options.stream_threshold is not None and os.path.getsize(from_path) > options.stream_threshold
+
+def page_output_path(from_path, content_dir, dest_dir) -> str:
+    to_path = os.path.join(dest_dir, os.path.relpath(from_path, content_dir))
+
+    return to_path.removesuffix(".md") + ".html"
+
+def page_paths(entries, content_dir, dest_dir) -> list[tuple[str, str]]:
+    from_paths = [os.path.join(content_dir, entry.path) for entry in entries]
+
+    return [(from_path, page_output_path(from_path, content_dir, dest_dir)) for from_path in from_paths]
+
+def find_pages(content_dir, dest_dir, ignore=DEFAULT_IGNORE) -> list[tuple[str, str]]:
+    entries = [entry for entry in scan_tree(content_dir, ignore) if entry.path.endswith(".md")]
+
+    return page_paths(entries, content_dir, dest_dir)
+
+class PageResult():
+    __slots__ = ("from_path", "to_path", "error", "profile", "status", "index")
+
+    def __init__(self, from_path, to_path, error = None, profile = None, status = None, index = None) -> None:
+        self.from_path: str = from_path
+        self.to_path: str = to_path
+        self.error: str | None = error
+        self.profile: PageProfile | None = profile
+        # "added", "changed" or "unchanged" once the output has been written, or
+        # "removed" when a page that had been published is now a draft
+        self.status: str | None = status
+        self.index: PageIndex = index or PageIndex()
+
+class RenderOptions():
+    __slots__ = ("profiled", "block_cache", "io_threads", "stream_threshold", "asset_references", "minify", "drafts")
+
+    def __init__(self, profiled = False, block_cache = None, io_threads = 0, stream_threshold = None, asset_references = NO_ASSET_REFERENCES, minify = False, drafts = False) -> None:
+        self.profiled: bool = profiled
+        self.block_cache: BlockCache | None = block_cache
+        self.io_threads: int = io_threads
+        # Sources larger than this many bytes are rendered block by block from the file
+        self.stream_threshold: int | None = stream_threshold
+        self.asset_references: AssetReferences = asset_references
+        self.minify: bool = minify
+        self.drafts: bool = drafts
+
+def new_result(from_path, to_path, options) -> tuple[PageResult, PageProfile | NullProfile]:
+    profile = PageProfile(from_path) if options.profiled else NO_PROFILE
+    result = PageResult(from_path, to_path, profile=profile if options.profiled else None)
+
+    return result, profile
+
+def render_page(work) -> PageResult:
+    from_path, to_path, template_path, options = work
+    result, profile = new_result(from_path, to_path, options)
+
+    generate = generate_page_streaming if should_stream(from_path, options) else generate_page
+
+    try:
+        result.status = generate(from_path, to_path, template_path, options, profile, result.index)
+    except Exception as e:
+        result.error = repr(e)
+
+    return result
+
+def render_pages_overlapped(work, io_threads) -> list[PageResult]:
+    results = []
+    window = io_threads * 2
+    pending_reads = deque()
+    pending_writes = deque()
+    remaining = iter(work)
+
+    def prefetch():
+        item = next(remaining, None)
+
+        if item:
+            from_path, to_path, _, options = item
+            result, profile = new_result(from_path, to_path, options)
+
+            # Huge sources are streamed on this thread instead of being read whole
+            if should_stream(from_path, options):
+                pending_reads.append((item, result, profile, None))
+            else:
+                pending_reads.append((item, result, profile, io.submit(read_source, from_path, profile)))
+
+    def finish_write():
+        result, future = pending_writes.popleft()
+
+        try:
+            result.status = future.result()
+        except Exception as e:
+            result.error = repr(e)
+
+    # Sources are read ahead and pages written behind on I/O threads while this
+    # thread renders, so the CPU never waits on a slow filesystem unless the
+    # prefetch window runs dry
+    with ThreadPoolExecutor(max_workers=io_threads) as io:
+        for _ in range(window):
+            prefetch()
+
+        while pending_reads:
+            (from_path, to_path, template_path, options), result, profile, read = pending_reads.popleft()
+            prefetch()
+            results.append(result)
+
+            if read is None:
+                try:
+                    result.status = generate_page_streaming(from_path, to_path, template_path, options, profile, result.index)
+                except Exception as e:
+                    result.error = repr(e)
+
+                continue
+
+            try:
+                page = render_source(read.result(), from_path, to_path, template_path, options, profile, result.index)
+
+                if page is None:
+                    result.status = remove_draft_output(to_path)
+                    continue
+            except Exception as e:
+                result.error = repr(e)
+                continue
+
+            pending_writes.append((result, io.submit(write_text, to_path, page, profile)))
+
+            # Bound the rendered pages held in memory when writes fall behind
+            while len(pending_writes) > window:
+                finish_write()
+
+        while pending_writes:
+            finish_write()
+
+    return results
+
+def render_pages(work) -> list[PageResult]:
+    io_threads = work[0][3].io_threads if work else 0
+
+    if io_threads:
+        return render_pages_overlapped(work, io_threads)
+
+    return list(map(render_page, work))
+
+def generate_pages(pages, template_path, jobs=1, options=None) -> list[PageResult]:
+    options = options or RenderOptions()
+    work = [(from_path, to_path, template_path, options) for from_path, to_path in pages]
+
+    if jobs > 1 and len(work) > 1:
+        # Workers only ever write their own output file, so the finished tree
+        # does not depend on scheduling order
+        chunksize = max(1, len(work) // (jobs * 4))
+        chunks = [work[start:start + chunksize] for start in range(0, len(work), chunksize)]
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as executor:
+            return [result for results in executor.map(render_pages, chunks) for result in results]
+
+    return render_pages(work)
+
+def page_failures(results) -> list[tuple[str, str]]:
+    return [(result.from_path, result.error) for result in results if result.error]
+
+def generate_pages_incremental(pages, template_path, previous, jobs=1, options=None, changes=None) -> tuple[dict, list[PageResult]]:
+    options = options or RenderOptions()
+    template_hashes = {}
+    current = {
+        "generator": generator_version(),
+        "template": hash_template(template_path),
+        "asset_urls": options.asset_references.urls,
+        "image_sizes": options.asset_references.dimensions,
+        "minify": options.minify,
+        "drafts": options.drafts,
+        # A page's own template is known from the metadata index, as a page
+        # whose source is unchanged still names the template it named last build
+        "pages": {
+            from_path: {
+                "source": hash_file(from_path),
+                "output": to_path,
+                "template": page_template_hash(template_path, previous["metadata"].get(from_path, {}), template_hashes),
+            }
+            for from_path, to_path in pages
+        },
+    }
+
+    for output in removed_outputs(previous, current):
+        if os.path.exists(output):
+            print(f"Removing {output}")
+            os.remove(output)
+
+            if changes is not None:
+                changes.record(output, "removed")
+
+    stale = set(stale_pages(previous, current))
+    results = generate_pages(filter(lambda page: page[0] in stale, pages), template_path, jobs, options)
+
+    # Pages that were not re-rendered keep the metadata, links and search terms recorded when they last were
+    for key in ["metadata", "links", "search"]:
+        current[key] = {
+            from_path: data
+            for from_path, data in previous[key].items()
+            if from_path in current["pages"] and from_path not in stale
+        }
+
+    for result in results:
+        current["metadata"][result.from_path] = result.index.metadata
+        current["pages"][result.from_path]["template"] = page_template_hash(template_path, result.index.metadata, template_hashes)
+
+        # Unpublished drafts have no output to link to or search
+        if not is_unpublished(result.index.metadata, options.drafts):
+            current["links"][result.from_path] = list(result.index.links)
+            current["search"][result.from_path] = {"title": result.index.title, "terms": result.index.terms}
+
+    # Forget failed pages so the next incremental build retries them
+    for from_path, _ in page_failures(results):
+        for key in ["pages", "metadata", "links", "search"]:
+            current[key].pop(from_path, None)
+
+    if changes is not None:
+        for result in results:
+            if result.status:
+                changes.record(result.to_path, result.status)
+
+    return current, results
+
+def write_listings(manifest, previous, template_path, page_size=None, options=None, changes=None) -> dict[str, str]:
+    options = options or RenderOptions()
+    listings = []
+
+    # Without listings this still takes down the ones an earlier build wrote
+    if page_size:
+        listings = collect_listings(manifest["pages"], manifest["metadata"], "content", "public", page_size, options.drafts)
+
+    return generate_listings(
+        listings,
+        template_path,
+        previous["listings"],
+        "public",
+        inputs_changed(previous, manifest),
+        options.asset_references,
+        options.minify,
+        changes,
     )
-    generate_pages(
-        os.listdir("content"),
-        "template.html",
+
+def write_site_search_index(manifest, changes=None):
+    documents, shards = build_search_index(
+        (page_url(manifest["pages"][from_path]["output"], "public"), page["title"], page["terms"])
+        for from_path, page in sorted(manifest["search"].items())
+    )
+    write_search_index(os.path.join("public", SEARCH_DIR), documents, shards, changes)
+
+def check_links(manifest) -> list[tuple[str, str]]:
+    # An unpublished draft has no output, so linking to it is as broken as linking to nothing
+    published = [
+        page["output"]
+        for from_path, page in manifest["pages"].items()
+        if not is_unpublished(manifest["metadata"].get(from_path, {}), manifest["drafts"])
+    ]
+    outputs = chain(published, manifest["listings"])
+    targets = link_targets(outputs, manifest["assets"], "public")
+    page_links = {
+        from_path: (page_url(manifest["pages"][from_path]["output"], "public"), links)
+        for from_path, links in manifest["links"].items()
+    }
+    broken_links = find_broken_links(page_links, targets)
+
+    if broken_links:
+        print_broken_links(broken_links)
+
+    return broken_links
+
+def shard_argument(value) -> tuple[int, int]:
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a static site from markdown content")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-render pages whose inputs changed since the last build",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes used to render pages (default: CPU count)",
+    )
+
+    parser.add_argument(
+        "--ignore",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="skip content and static files whose name or relative path matches GLOB, e.g. 'drafts/*' (repeatable)",
+    )
+
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static assets by content hash as well as size and mtime",
+    )
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default="copy",
+        help="how changed static assets are placed in the output directory",
+    )
+
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILE_PATH,
+        metavar="PATH",
+        help=f"time each page and stage, print the slowest and write a JSON report (default: {PROFILE_PATH})",
+    )
+
+    parser.add_argument(
+        "--no-block-cache",
+        dest="block_cache",
+        action="store_false",
+        help="render every block instead of reusing cached fragments",
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=256,
+        metavar="MB",
+        help="size cap of the block cache; least recently used fragments are evicted (default: 256)",
+    )
+
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=0,
+        metavar="N",
+        help="read sources ahead and write pages behind on N threads while rendering (default: off)",
+    )
+
+    parser.add_argument(
+        "--deploy-manifest",
+        default=DEPLOY_MANIFEST_PATH,
+        metavar="PATH",
+        help=f"where to write the added, changed and removed output paths (default: {DEPLOY_MANIFEST_PATH})",
+    )
+
+    parser.add_argument(
+        "--stream-threshold",
+        type=int,
+        default=16,
+        metavar="MB",
+        help="render sources larger than this block by block in bounded memory (default: 16)",
+    )
+
+    parser.add_argument(
+        "--no-search-index",
+        dest="search_index",
+        action="store_false",
+        help=f"do not write the sharded full-text search index to public/{SEARCH_DIR}",
+    )
+
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="write pages without insignificant whitespace, optional quotes or void end tags",
+    )
+
+    parser.add_argument(
+        "--drafts",
+        action="store_true",
+        help="also render pages whose front matter sets draft: true",
+    )
+
+    parser.add_argument(
+        "--listings",
+        nargs="?",
+        type=int,
+        const=20,
+        metavar="PER_PAGE",
+        help="write paginated listings of each directory (at all/) and each tag (at tags/<tag>/), PER_PAGE pages each (default: 20)",
+    )
+
+    parser.add_argument(
+        "--no-image-sizes",
+        dest="image_sizes",
+        action="store_false",
+        help="do not add the intrinsic width and height of static images to <img> tags",
+    )
+    parser.add_argument(
+        "--dedupe-images",
+        action="store_true",
+        help="hardlink byte-identical images in the output to one copy and point pages at it",
+    )
+
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static assets to content-hashed names and point pages at them",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and .br when brotli is installed) next to every HTML, CSS, JS and SVG output",
+    )
+
+    parser.add_argument(
+        "--strict-links",
+        action="store_true",
+        help="fail the build when a page links to a page or asset that was not generated",
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=shard_argument,
+        metavar="I/N",
+        help="render only the I-th of N stable slices of the pages and assets, for merging with src/merge.py",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    if args.io_threads < 0:
+        parser.error("--io-threads must not be negative")
+
+    if args.listings is not None and args.listings < 1:
+        parser.error("--listings must be at least 1")
+
+    if args.shard and args.incremental:
+        parser.error("--shard builds start from an empty manifest and cannot be --incremental")
+
+    return args
+
+def render_options(args, asset_references) -> RenderOptions:
+    block_cache = None
+
+    if args.block_cache:
+        block_cache = BlockCache(
+            BLOCK_CACHE_PATH, args.block_cache_size * 1024 * 1024, generator_version(), minify=args.minify
+        )
+
+    return RenderOptions(
+        bool(args.profile),
+        block_cache,
+        args.io_threads,
+        args.stream_threshold * 1024 * 1024,
+        asset_references,
+        args.minify,
+        args.drafts,
+    )
+
+def main(argv=None):
+    args = parse_args(argv)
+    site = discover("content", "static", (*DEFAULT_IGNORE, *args.ignore))
+    owns = lambda path: args.shard is None or in_shard(path, args.shard)
+    pages = [page for page in page_paths(site.pages, "content", "public") if owns(page[0])]
+    owned_assets = [entry for entry in site.assets if owns(os.path.join("static", entry.path))]
+
+    previous = load_manifest(MANIFEST_PATH)
+    changes = OutputChanges("public")
+
+    # A shard cannot tell another shard's outputs from stale ones, so it neither
+    # reuses nor sweeps anything, and leaves the shared manifest to the merge
+    if args.shard:
+        previous = empty_manifest()
+
+    # A full build re-renders every page, but identical outputs are still left untouched
+    if not args.incremental:
+        previous = {**previous, "generator": None}
+
+    # Every shard indexes all assets, as any page may reference any of them
+    asset_index = index_assets("static", site.assets, previous["asset_index"], args.jobs)
+    duplicates = find_duplicates(asset_index)
+    linked = {path: canonical for canonical, *copies in duplicates for path in copies} if args.dedupe_images else {}
+    assets = sync_tree("static", "public", previous["assets"], args.checksum, args.link, changes, owned_assets, linked)
+    canonical_urls = {}
+
+    if duplicates:
+        print_duplicates(duplicates)
+
+        if args.dedupe_images:
+            canonical_urls = duplicate_urls(duplicates)
+            link_duplicates("public", [
+                [canonical, *(path for path in copies if owns(os.path.join("static", path)))]
+                for canonical, *copies in duplicates
+                if owns(os.path.join("static", canonical))
+            ])
+
+    # Duplicates are served from their canonical copy, so only that one is fingerprinted
+    fingerprinted = {
+        path: entry
+        for path, entry in asset_index.items()
+        if args.fingerprint and asset_url(path) not in canonical_urls
+    }
+    fingerprint_assets(
+        "static",
         "public",
-        "content"
+        {path: entry for path, entry in fingerprinted.items() if owns(os.path.join("static", path))},
+        previous["fingerprinted_urls"],
+        args.link,
+        changes,
     )
+    fingerprinted_urls = fingerprint_urls(fingerprinted)
+    asset_urls = {
+        **fingerprinted_urls,
+        **{url: fingerprinted_urls.get(canonical, canonical) for url, canonical in canonical_urls.items()},
+    }
+    image_sizes = {}
+
+    if args.image_sizes:
+        image_sizes = {
+            asset_url(path): [entry["width"], entry["height"]]
+            for path, entry in asset_index.items()
+            if entry["width"] is not None
+        }
+
+    options = render_options(args, AssetReferences("public", asset_urls, image_sizes))
+    current, results = generate_pages_incremental(pages, "template.html", previous, args.jobs, options, changes)
+    current = {**current, "assets": assets, "asset_index": asset_index, "fingerprinted_urls": fingerprinted_urls}
+
+    # Listings need every page's metadata, so a sharded build leaves them to the merge
+    if not args.shard:
+        current["listings"] = write_listings(current, previous, "template.html", args.listings, options, changes)
+
+    if args.search_index and not args.shard:
+        write_site_search_index(current, changes)
+
+    if not args.incremental and not args.shard:
+        files = list_files("public")
+
+        # Precompression removes the siblings of whatever the sweep removes
+        if args.precompress:
+            files = [path for path in files if compressed_source(path) is None]
+
+        changes.sweep(files)
+
+    if args.precompress:
+        files = list_files("public")
+
+        if args.shard:
+            files = [path for path in files if path in changes.statuses]
+
+        precompress_tree("public", files, args.jobs, changes)
+
+    if args.shard:
+        save_manifest(shard_manifest_path(args.shard), shard_manifest(args.shard, current, changes.statuses))
+    else:
+        save_manifest(MANIFEST_PATH, current)
+
+    save_changes(args.deploy_manifest, changes)
+
+    if options.block_cache:
+        options.block_cache.evict()
+
+    # Links into other shards only resolve once the shards are merged
+    broken_links = [] if args.shard else check_links(current)
+
+    if args.profile:
+        report = build_report(result.profile for result in results)
+        print_report(report)
+        save_report(args.profile, report)
+
+    failures = page_failures(results)
+
+    if failures:
+        raise failed_pages_error(failures)
+
+    if broken_links and args.strict_links:
+        raise ValueError(f"{len(broken_links)} broken internal link(s)")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,91 @@
+import glob
+import hashlib
+import json
+import os
+from functools import cache
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+@cache
+def generator_version() -> str:
+    # Any change to the generator itself invalidates every previously rendered page
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+
+    sources = sorted(glob.glob(os.path.join(source_dir, "*.py")))
+
+    for source in filter(lambda path: not os.path.basename(path).startswith("test_"), sources):
+        digest.update(hash_file(source).encode())
+
+    return digest.hexdigest()
+
+def empty_manifest() -> dict:
+    return {"generator": None, "template": None, "pages": {}, "assets": [], "links": {}, "search": {}, "asset_index": {}, "fingerprinted_urls": {}, "asset_urls": {}, "image_sizes": {}, "minify": None, "drafts": None, "metadata": {}, "listings": {}}
+
+def load_manifest(path) -> dict:
+    if not os.path.exists(path):
+        return empty_manifest()
+
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return empty_manifest()
+
+    return {**empty_manifest(), **manifest}
+
+def save_manifest(path, manifest):
+    directory = os.path.dirname(path)
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def inputs_changed(previous, current) -> bool:
+    # Anything that every page and listing is rendered with
+    return (
+        previous["generator"] != current["generator"] or
+        previous["template"] != current["template"] or
+        # Pages embed the fingerprinted URL of every asset they reference
+        previous["asset_urls"] != current["asset_urls"] or
+        previous["image_sizes"] != current["image_sizes"] or
+        previous["minify"] != current["minify"] or
+        previous["drafts"] != current["drafts"]
+    )
+
+def stale_pages(previous, current) -> list:
+    changed = inputs_changed(previous, current)
+
+    def is_stale(from_path):
+        page = current["pages"][from_path]
+        previous_page = previous["pages"].get(from_path)
+
+        # An unpublished draft has no output, and needs none while it is unchanged
+        unpublished = previous["metadata"].get(from_path, {}).get("draft", False) and not current["drafts"]
+
+        return (
+            changed or
+            previous_page != page or
+            not (os.path.exists(page["output"]) or unpublished)
+        )
+
+    return list(filter(is_stale, current["pages"]))
+
+def removed_outputs(previous, current) -> list:
+    removed = filter(lambda from_path: from_path not in current["pages"], previous["pages"])
+
+    return list(map(lambda from_path: previous["pages"][from_path]["output"], removed))
@@ -0,0 +1,110 @@
+import argparse
+import glob
+import os
+
+from compress import precompress_tree
+from main import DEPLOY_MANIFEST_PATH, MANIFEST_PATH, RenderOptions, check_links, write_listings, write_site_search_index
+from manifest import empty_manifest, save_manifest
+from outputs import OutputChanges, save_changes
+from references import AssetReferences
+from search import SEARCH_DIR
+from shards import load_shard_manifests, merge_changes, merge_shards
+
+SHARD_MANIFEST_PATTERN = os.path.join(".cache", "shard-*-of-*.json")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Combine the outputs of sharded builds into one site")
+    parser.add_argument(
+        "manifests",
+        nargs="*",
+        metavar="MANIFEST",
+        help=f"shard manifests written by main.py --shard (default: {SHARD_MANIFEST_PATTERN})",
+    )
+    parser.add_argument(
+        "--no-search-index",
+        dest="search_index",
+        action="store_false",
+        help=f"do not write the full-text search index to public/{SEARCH_DIR}",
+    )
+    parser.add_argument(
+        "--listings",
+        nargs="?",
+        type=int,
+        const=20,
+        metavar="PER_PAGE",
+        help="write paginated directory and tag listings, PER_PAGE pages each (default: 20)",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and .br when brotli is installed) next to the search index and listings",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of threads used to precompress (default: CPU count)",
+    )
+    parser.add_argument(
+        "--deploy-manifest",
+        default=DEPLOY_MANIFEST_PATH,
+        metavar="PATH",
+        help=f"where to write the added, changed and removed output paths of all shards (default: {DEPLOY_MANIFEST_PATH})",
+    )
+    parser.add_argument(
+        "--strict-links",
+        action="store_true",
+        help="fail when a page links to a page or asset that no shard generated",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    if args.listings is not None and args.listings < 1:
+        parser.error("--listings must be at least 1")
+
+    if not args.manifests:
+        args.manifests = sorted(glob.glob(SHARD_MANIFEST_PATTERN))
+
+    if not args.manifests:
+        parser.error(f"no shard manifests given or found at {SHARD_MANIFEST_PATTERN}")
+
+    return args
+
+def main(argv=None):
+    # The shards' public/ directories must already be unpacked into one public/
+    args = parse_args(argv)
+    manifests = load_shard_manifests(args.manifests)
+    manifest = merge_shards(manifests)
+    changes = OutputChanges("public")
+
+    # Listings are rendered here, where the metadata of every page is known,
+    # with the same template, asset URLs and options the shards used
+    options = RenderOptions(
+        asset_references=AssetReferences("public", manifest["asset_urls"], manifest["image_sizes"]),
+        minify=manifest["minify"],
+        drafts=manifest["drafts"],
+    )
+    manifest["listings"] = write_listings(manifest, empty_manifest(), "template.html", args.listings, options, changes)
+
+    if args.search_index:
+        write_site_search_index(manifest, changes)
+
+    if args.precompress:
+        files = [path for path, status in changes.statuses.items() if status != "removed"]
+        precompress_tree("public", files, args.jobs, changes)
+
+    # The merged manifest is what one unsharded build would have written, so
+    # a later --incremental build carries on from it
+    save_manifest(MANIFEST_PATH, manifest)
+    merge_changes(manifests, changes)
+    save_changes(args.deploy_manifest, changes)
+    broken_links = check_links(manifest)
+
+    if broken_links and args.strict_links:
+        raise ValueError(f"{len(broken_links)} broken internal link(s)")
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,49 @@
+from blocktoken import BlockToken
+from frontmatter import read_front_matter
 from htmlnode import LeafNode, ParentNode
+from pageindex import index_block
+from profiling import NO_PROFILE
 from textnode import TextNode, TextType
 from functools import reduce
+from typing import Iterable, Iterator
 
+import io
 import re
 
 image_or_link_regex = re.compile(r"(!?)\[(.*?)\]\((.*?)\)")
-block_type_regexes = {
-    "heading": re.compile(r"(^#{1,6}) (.*)"),
-    "code": re.compile(r"```(\w+)?(.*?\n)?```", flags=re.DOTALL),
-    "quote": re.compile(r"^(>)(.*?)(?=\n|$)", flags=re.MULTILINE),
-    "unordered_list": re.compile(r"^(-|\*) (.*)(?=\n|$)", flags=re.MULTILINE),
-    "ordered_list": re.compile(r"^(\d+|\*). (.*)(?=\n|$)", flags=re.MULTILINE),
-    "paragraph": re.compile(r".*"),
-}
+inline_regex = re.compile(
+    r"(?P<image>!)?\[(?P<label>.*?)\]\((?P<url>.*?)\)"
+    r"|(?s:`(?P<code>.*?)`)"
+    r"|(?s:\*\*(?P<bold>.+?)\*\*)"
+    r"|(?s:\*(?P<italic>[^*]+?)\*)"
+)
+inline_delimiters = ("*", "`")
+heading_regex = re.compile(r"(#{1,6}) (.*)")
+code_regex = re.compile(r"```(\w*)(.*?\n)?```", flags=re.DOTALL)
+unordered_list_item_regex = re.compile(r"^[-*] (.*)$", flags=re.MULTILINE)
+ordered_list_item_regex = re.compile(r"^\d+\. (.*)$", flags=re.MULTILINE)
 
-def extract_title(doc):
-    title_parts = re.findall(r"(^# )(.*)", doc, re.MULTILINE)
+def block_title(block) -> str | None:
+    # The first level one heading is the title, so only a block starting with one can hold it
+    if block.startswith("# "):
+        return block[2:].split("\n", 1)[0].strip()
 
-    if title_parts:
-        _, title = title_parts[0]
-    else:
-        raise ValueError("Missing title from markdown document")
+    return None
+
+def page_title(front_matter, blocks: Iterable[str]) -> str:
+    if "title" in front_matter:
+        return front_matter["title"]
+
+    for block in blocks:
+        title = block_title(block)
+
+        if title is not None:
+            return title
 
-    return title
+    raise ValueError("Missing title from markdown document")
+
+def extract_title(doc):
+    return page_title(*split_page(io.StringIO(doc)))
 
 def text_node_to_html_node(text_node):
     match text_node.text_type:
@@ -121,65 +142,129 @@ def split_nodes_with_source(old_nodes):
     return new_nodes
 
 def text_to_textnodes(text):
-    initial_text_node = TextNode(text, TextType.TEXT)
+    nodes = []
+    position = 0
+
+    def append_text(segment):
+        if any(delimiter in segment for delimiter in inline_delimiters):
+            raise ValueError("Unbalanced inline markdown node")
+
+        if segment:
+            nodes.append(TextNode(segment, TextType.TEXT))
+
+    # One left-to-right scan: the alternation tries links and images, then
+    # code, bold and italic at each position, so no node list is re-split
+    for match in inline_regex.finditer(text):
+        append_text(text[position:match.start()])
+        position = match.end()
+
+        match match.lastgroup:
+            case "url":
+                text_type = TextType.IMAGE if match["image"] else TextType.LINK
+                nodes.append(TextNode(match["label"], text_type, match["url"]))
+            case "code":
+                nodes.append(TextNode(match["code"], TextType.CODE))
+            case "bold":
+                nodes.append(TextNode(match["bold"], TextType.BOLD))
+            case "italic":
+                nodes.append(TextNode(match["italic"], TextType.ITALIC))
+
+    append_text(text[position:])
+
+    return nodes
+
+def tokenize_block(block) -> BlockToken:
+    text = block.strip()
+
+    # The first character decides which block type can possibly match, so each
+    # block is scanned once by at most one pattern
+    match text[:1]:
+        case "#":
+            heading = heading_regex.match(text)
+
+            if heading:
+                heading_level, heading_text = heading.groups()
+                return BlockToken("heading", heading_text, level=len(heading_level))
+        case "`":
+            code = code_regex.match(text)
+
+            if code:
+                language, content = code.groups()
+                return BlockToken("code", content or "", language=language or None)
+        case ">":
+            lines = map(lambda line: line.removeprefix(">"), text.split("\n"))
+            return BlockToken("quote", "\n".join(lines).strip())
+        case "-" | "*" if text[1:2] == " ":
+            return BlockToken("unordered_list", unordered_list_item_regex.findall(text))
+        case first if first.isdigit() and ordered_list_item_regex.match(text):
+            return BlockToken("ordered_list", ordered_list_item_regex.findall(text))
+
+    return BlockToken("paragraph", text)
 
-    split = split_nodes_with_source([initial_text_node])
-    split = split_nodes_delimiter(split, "**", TextType.BOLD)
-    split = split_nodes_delimiter(split, "*", TextType.ITALIC)
-    split = split_nodes_delimiter(split, "`", TextType.CODE)
+def block_to_block_type(block):
+    return tokenize_block(block).block_type
 
-    return split
+def iter_blocks(lines: Iterable[str]) -> Iterator[str]:
+    block = []
+    in_fence = False
 
-def block_to_block_type(block):
-    for block_type, matcher in block_type_regexes.items():
-        matches = matcher.findall(block)
-        if matches:
-            return block_type
+    for line in lines:
+        stripped = line.strip()
 
-def markdown_to_blocks(doc) -> list[str]:
-    blocks = (doc or "").split("\n\n")
+        # Blank lines inside a fenced code block belong to the code
+        if stripped.startswith("```") and stripped.count("```") % 2 == 1:
+            in_fence = not in_fence
 
-    return list(map(lambda block: block.strip(), blocks))
+        if stripped or in_fence:
+            block.append(line)
+        elif block:
+            yield "".join(block).strip()
+            block = []
+
+    if block:
+        yield "".join(block).strip()
+
+def split_page(lines: Iterable[str]) -> tuple[dict, Iterator[str]]:
+    front_matter, lines = read_front_matter(lines)
+
+    return front_matter, iter_blocks(lines)
+
+def markdown_to_blocks(doc) -> list[str]:
+    return list(iter_blocks(io.StringIO(doc or "")))
 
 def block_to_html_node(block: str):
-    blocktype = block_to_block_type(block)
-    matcher = block_type_regexes[blocktype]
-    matches = matcher.findall(block)
+    return block_token_to_html_node(tokenize_block(block))
 
+def block_token_to_html_node(token: BlockToken):
     tag = ""
     children = []
-    props = {}
+    props = None
 
-    match blocktype:
+    match token.block_type:
         case "heading":
-            heading_level, heading_text = matches[0]
-            tag = f"h{len(heading_level)}"
-            text_nodes = text_to_textnodes(heading_text)
+            tag = f"h{token.level}"
+            text_nodes = text_to_textnodes(token.content)
             children = list(map(text_node_to_html_node, text_nodes))
         case "code":
-            language, content = matches[0]
             tag = "pre"
 
-            if language:
-                props = {"class": f"highlight-source-{language}"}
+            if token.language:
+                props = {"class": f"highlight-source-{token.language}"}
 
-            children = [LeafNode("code", content)]
+            children = [LeafNode("code", token.content)]
         case "quote":
             tag = "blockquote"
-            content = block.replace(">", "").strip()
-            text_nodes = text_to_textnodes(content)
+            text_nodes = text_to_textnodes(token.content)
             children = list(map(text_node_to_html_node, text_nodes))
         case "unordered_list":
             tag = "ul"
-            list_items_content = map(lambda match: match[1], matches)
-            children = list(map(list_content_to_html_list_item, list_items_content))
+            children = list(map(list_content_to_html_list_item, token.content))
         case "ordered_list":
             tag = "ol"
-            list_items_content = map(lambda match: match[1], matches)
-            children = list(map(list_content_to_html_list_item, list_items_content))
+            children = list(map(list_content_to_html_list_item, token.content))
         case "paragraph":
             tag = "p"
-            text_nodes = text_to_textnodes(block)
+            text_nodes = text_to_textnodes(token.content)
             children = list(map(text_node_to_html_node, text_nodes))
 
     return ParentNode(tag, children, props)
@@ -190,9 +275,92 @@ def list_content_to_html_list_item(content):
 
     return ParentNode("li", children)
 
-def markdown_to_html_node(doc):
-    blocks = markdown_to_blocks(doc)
-    children = list(map(block_to_html_node, blocks))
+def parse_block(block, profile=NO_PROFILE):
+    with profile.stage("parse_blocks"):
+        token = tokenize_block(block)
+
+    with profile.stage("parse_inline"):
+        return block_token_to_html_node(token)
+
+def uncached_block_to_html_node(block, profile=NO_PROFILE, index=None):
+    node = parse_block(block, profile)
+
+    if index is not None:
+        index.add(index_block(node))
+
+    return node
+
+def cached_block_to_html_node(block, cache, profile=NO_PROFILE, index=None, references=None):
+    # Tiny blocks render faster than a cache file can be opened
+    if len(block) < cache.min_block_size:
+        return uncached_block_to_html_node(block, profile, index)
+
+    with profile.stage("block_cache"):
+        entry = cache.get(block)
+
+    node = None
+
+    if entry is None:
+        node = parse_block(block, profile)
+
+        with profile.stage("serialize"):
+            entry = {"html": node.to_html(cache.minify), **index_block(node)}
+
+        with profile.stage("block_cache"):
+            cache.put(block, entry)
+
+    if index is not None:
+        index.add(entry)
+
+    # Fragments are cached before any asset URL is rewritten, so one that links
+    # a rewritten asset is parsed again for a tree to rewrite
+    if references and references.rewrites(entry["links"]):
+        return node or parse_block(block, profile)
+
+    # A tagless leaf writes its value verbatim, so the cached fragment is spliced in as is
+    return LeafNode(None, entry["html"])
+
+def render_block(block, profile=NO_PROFILE, cache=None, index=None, references=None):
+    if cache:
+        node = cached_block_to_html_node(block, cache, profile, index, references)
+    else:
+        node = uncached_block_to_html_node(block, profile, index)
+
+    if references:
+        node = references.rewrite_node(node)
+
+    return node
+
+class StreamingContent():
+    # Renders blocks one at a time as they are written, so only the current
+    # block's tree is ever in memory. Like an HTMLNode it can be written once.
+    def __init__(self, blocks: Iterable[str], profile=NO_PROFILE, cache=None, index=None, references=None) -> None:
+        self.blocks = blocks
+        self.profile = profile
+        self.cache = cache
+        self.index = index
+        self.references = references
+
+    def iter_html(self, minify=False) -> Iterator[str]:
+        yield "<div>"
+
+        for block in self.blocks:
+            yield from render_block(block, self.profile, self.cache, self.index, self.references).iter_html(minify)
+
+        yield "</div>"
+
+    def write_to(self, f, minify=False):
+        f.writelines(self.iter_html(minify))
+
+def blocks_to_html_node(blocks, profile=NO_PROFILE, cache=None, index=None, references=None):
+    children = [render_block(block, profile, cache, index, references) for block in blocks]
     content = ParentNode("div", children)
 
     return content
+
+def markdown_to_html_node(doc, profile=NO_PROFILE, cache=None, index=None):
+    with profile.stage("split_blocks"):
+        _, blocks = split_page(io.StringIO(doc or ""))
+        blocks = list(blocks)
+
+    return blocks_to_html_node(blocks, profile, cache, index)
@@ -0,0 +1,63 @@
+import filecmp
+import json
+import os
+import tempfile
+
+from sync import remove_file
+
+def write_if_changed(path, write, mode="w") -> str:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+
+    try:
+        with os.fdopen(descriptor, mode) as f:
+            write(f)
+
+        exists = os.path.exists(path)
+
+        # Identical output keeps its old mtime, so rsync and CDN uploads skip it
+        if exists and filecmp.cmp(temporary_path, path, shallow=False):
+            os.remove(temporary_path)
+            return "unchanged"
+
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        # Never leave a half-written page behind
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+        raise
+
+    return "changed" if exists else "added"
+
+class OutputChanges():
+    def __init__(self, root) -> None:
+        self.root = root
+        self.statuses: dict[str, str] = {}
+
+    def record(self, path, status):
+        self.statuses[os.path.relpath(path, self.root)] = status
+
+    def paths(self, status) -> list[str]:
+        return sorted(path for path, path_status in self.statuses.items() if path_status == status)
+
+    def to_dict(self) -> dict:
+        return {status: self.paths(status) for status in ["added", "changed", "removed"]}
+
+    def sweep(self, files):
+        # Anything in the output tree that this build did not produce is stale
+        for path in files:
+            if path not in self.statuses:
+                remove_file(self.root, path)
+                self.statuses[path] = "removed"
+
+def save_changes(path, changes):
+    directory = os.path.dirname(path)
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w") as f:
+        json.dump(changes.to_dict(), f, indent=2)
@@ -0,0 +1,55 @@
+import re
+
+term_regex = re.compile(r"\w+")
+# Text in separate block elements never runs together into one word
+BLOCK_TAGS = frozenset(["div", "p", "blockquote", "pre", "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6"])
+
+class PageIndex():
+    __slots__ = ("title", "links", "terms", "metadata")
+
+    def __init__(self) -> None:
+        self.title: str | None = None
+        # Each distinct link href and image src on the page, in document order
+        self.links: dict[str, None] = {}
+        # How many times each search term occurs in the page's text
+        self.terms: dict[str, int] = {}
+        # Front matter fields and the resolved title, as kept in the metadata index
+        self.metadata: dict = {}
+
+    def add(self, data: dict):
+        self.links.update(dict.fromkeys(data["links"]))
+
+        for term, count in data["terms"].items():
+            self.terms[term] = self.terms.get(term, 0) + count
+
+def tokenize(text) -> list[str]:
+    return [term for term in term_regex.findall(text.lower()) if len(term) > 1]
+
+def collect(node, links, texts):
+    match node.tag:
+        case "a":
+            links.append(node.props["href"])
+        case "img":
+            links.append(node.props["src"])
+
+    if node.tag in BLOCK_TAGS:
+        texts.append(" ")
+
+    if node.value:
+        texts.append(node.value)
+
+    for child in node.children:
+        collect(child, links, texts)
+
+def index_block(node) -> dict:
+    # Plain data, so it can be stored next to a cached fragment and replayed on a hit
+    links = []
+    texts = []
+    collect(node, links, texts)
+    terms = {}
+
+    # Inline leaves are joined without a gap, as "**bold**er" reads as one word
+    for term in tokenize("".join(texts)):
+        terms[term] = terms.get(term, 0) + 1
+
+    return {"links": links, "terms": terms}
@@ -0,0 +1,50 @@
+import io
+import os
+
+from frontmatter import page_metadata, template_values
+from orchestration import blocks_to_html_node, page_title, split_page
+from profiling import NO_PROFILE, count_nodes
+from template import load_template
+
+def page_template_path(template_path, metadata) -> str:
+    # Front matter names a template relative to the site's own
+    if metadata.get("template"):
+        return os.path.join(os.path.dirname(template_path), metadata["template"])
+
+    return template_path
+
+def is_unpublished(metadata, drafts) -> bool:
+    return metadata.get("draft", False) and not drafts
+
+def prepare_page(markdown, template_path, profile=NO_PROFILE, block_cache=None, index=None, minify=False, drafts=False, references=None, load=load_template):
+    # Everything from the markdown up to the template and its values, shared by
+    # the CLI build and the in-memory one, which passes a load that reads its source
+    with profile.stage("split_blocks"):
+        front_matter, blocks = split_page(io.StringIO(markdown))
+        blocks = list(blocks)
+
+    with profile.stage("extract_title"):
+        metadata = page_metadata(front_matter, page_title(front_matter, blocks))
+
+    if index is not None:
+        index.title = metadata["title"]
+        index.metadata = metadata
+
+    # A draft is never rendered unless asked for, so nothing past its front matter is parsed
+    if is_unpublished(metadata, drafts):
+        return None
+
+    with profile.stage("read"):
+        template = load(page_template_path(template_path, metadata), minify)
+
+    content = blocks_to_html_node(blocks, profile, block_cache, index, references)
+
+    if profile.enabled:
+        profile.nodes = count_nodes(content)
+
+    return template, {**template_values(metadata), "Content": content}
+
+def failed_pages_error(failures):
+    details = "\n".join(f"  {from_path}: {error}" for from_path, error in failures)
+
+    return ValueError(f"{len(failures)} page(s) failed to generate:\n{details}")
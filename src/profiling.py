@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+STAGES = ["read", "extract_title", "split_blocks", "block_cache", "parse_blocks", "parse_inline", "serialize", "write", "stream"]
+
+class PageProfile():
+    __slots__ = ("path", "stages", "nodes", "bytes_out")
+    enabled = True
+
+    def __init__(self, path) -> None:
+        self.path = path
+        self.stages: dict[str, float] = {}
+        self.nodes = 0
+        self.bytes_out = 0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "total": self.total(),
+            "stages": self.stages,
+            "nodes": self.nodes,
+            "bytes_out": self.bytes_out,
+        }
+
+class NullProfile():
+    __slots__ = ()
+    enabled = False
+
+    def stage(self, name):
+        return NULL_STAGE
+
+NULL_STAGE = nullcontext()
+# Shared by unprofiled builds so the hooks cost one method call each
+NO_PROFILE = NullProfile()
+
+def count_nodes(node) -> int:
+    return 1 + sum(map(count_nodes, node.children))
+
+def build_report(profiles) -> dict:
+    pages = sorted((profile.to_dict() for profile in profiles), key=lambda page: page["total"], reverse=True)
+    stages = {stage: 0.0 for stage in STAGES}
+
+    for page in pages:
+        for stage, elapsed in page["stages"].items():
+            stages[stage] = stages.get(stage, 0.0) + elapsed
+
+    return {
+        "total": sum(stages.values()),
+        "stages": stages,
+        "nodes": sum(page["nodes"] for page in pages),
+        "bytes_out": sum(page["bytes_out"] for page in pages),
+        "pages": pages,
+    }
+
+def print_report(report, top=10):
+    total = report["total"] or 1
+
+    print(f"\n{'stage':<16}{'seconds':>10}{'share':>8}")
+
+    for stage, elapsed in sorted(report["stages"].items(), key=lambda item: item[1], reverse=True):
+        print(f"{stage:<16}{elapsed:>10.4f}{elapsed / total:>8.1%}")
+
+    print(f"\n{'slowest pages':<48}{'seconds':>10}{'nodes':>8}{'bytes':>10}  slowest stage")
+
+    for page in report["pages"][:top]:
+        slowest_stage = max(page["stages"], key=page["stages"].get, default="")
+        print(f"{page['path']:<48}{page['total']:>10.4f}{page['nodes']:>8}{page['bytes_out']:>10}  {slowest_stage}")
+
+def save_report(path, report):
+    directory = os.path.dirname(path)
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
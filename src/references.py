@@ -0,0 +1,122 @@
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+from htmlnode import HTMLNode, unquoted_value_regex
+from links import is_internal, page_url, resolve
+
+# Minified pages leave simple attribute values unquoted
+reference_regex = re.compile(r"\b(href|src)=(?:\"([^\"]*)\"|([^\s\"'=<>`]+))")
+image_tag_regex = re.compile(r"<img\b(?:[^>\"']|\"[^\"]*\"|'[^']*')*>")
+dimension_regex = re.compile(r"\s(?:width|height)=")
+
+class AssetReferences():
+    __slots__ = ("public_dir", "urls", "dimensions")
+
+    def __init__(self, public_dir, urls: dict[str, str] | None = None, dimensions: dict[str, list[int]] | None = None) -> None:
+        self.public_dir = public_dir
+        # Site-absolute asset URL to the URL pages should load it from instead
+        self.urls = urls or {}
+        # Site-absolute image URL to its intrinsic width and height
+        self.dimensions = dimensions or {}
+
+    def __bool__(self) -> bool:
+        return bool(self.urls or self.dimensions)
+
+    def for_page(self, to_path) -> "PageReferences":
+        # With nothing to rewrite there is no page URL to resolve against either
+        return PageReferences(self, page_url(to_path, self.public_dir) if self else None)
+
+class PageReferences():
+    # Rendered content is rewritten as nodes, so only real attributes change and
+    # text that merely looks like one, in code or prose, is written as is. Only
+    # the template's own text, which has no tree, is rewritten as HTML.
+    __slots__ = ("asset_references", "base_url")
+
+    def __init__(self, asset_references, base_url) -> None:
+        self.asset_references: AssetReferences = asset_references
+        self.base_url: str | None = base_url
+
+    def __bool__(self) -> bool:
+        return bool(self.asset_references)
+
+    def target(self, url) -> str | None:
+        return resolve(url, self.base_url) if is_internal(url) else None
+
+    def rewrites(self, urls) -> bool:
+        targets = [self.target(url) for url in urls]
+
+        return any(target in self.asset_references.urls or target in self.asset_references.dimensions for target in targets)
+
+    def rewrite_url(self, url) -> str:
+        replacement = self.asset_references.urls.get(self.target(url))
+
+        if replacement is None:
+            return url
+
+        parts = urlsplit(url)
+
+        return urlunsplit(("", "", replacement, parts.query, parts.fragment))
+
+    def rewrite_node(self, node: HTMLNode) -> HTMLNode:
+        if not self:
+            return node
+
+        if node.props:
+            props = dict(node.props)
+
+            # Dimensions are looked up by the original URL, so they go in before URLs are replaced
+            if node.tag == "img" and "src" in props and "width" not in props and "height" not in props:
+                dimensions = self.asset_references.dimensions.get(self.target(props["src"]))
+
+                if dimensions is not None:
+                    props["width"], props["height"] = str(dimensions[0]), str(dimensions[1])
+
+            for attribute in ("href", "src"):
+                if attribute in props:
+                    props[attribute] = self.rewrite_url(props[attribute])
+
+            node.props = props
+
+        for child in node.children:
+            self.rewrite_node(child)
+
+        return node
+
+    def rewrite(self, html) -> str:
+        if not self:
+            return html
+
+        def add_dimensions(match):
+            tag = match[0]
+            source = reference_regex.search(tag)
+
+            if dimension_regex.search(tag) or not source or source[1] != "src":
+                return tag
+
+            dimensions = self.asset_references.dimensions.get(self.target(source[2] or source[3]))
+
+            if dimensions is None:
+                return tag
+
+            end = -2 if tag.endswith("/>") else -1
+
+            return f"{tag[:end]} width=\"{dimensions[0]}\" height=\"{dimensions[1]}\"{tag[end:]}"
+
+        def replace_url(match):
+            attribute, quoted, unquoted = match.groups()
+            url = self.rewrite_url(quoted if quoted is not None else unquoted)
+
+            if quoted is None and unquoted_value_regex.fullmatch(url):
+                return f"{attribute}={url}"
+
+            return f"{attribute}=\"{url}\""
+
+        if self.asset_references.dimensions:
+            html = image_tag_regex.sub(add_dimensions, html)
+
+        if self.asset_references.urls:
+            html = reference_regex.sub(replace_url, html)
+
+        return html
+
+NO_ASSET_REFERENCES = AssetReferences(None)
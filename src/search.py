@@ -0,0 +1,51 @@
+import json
+import os
+
+from compress import compressed_source
+from outputs import write_if_changed
+from sync import list_files, remove_file
+
+SEARCH_DIR = "_search"
+SHARD_PREFIX_LENGTH = 2
+
+def shard_name(term) -> str:
+    # Hex of the UTF-8 prefix is safe in any file system and trivial to derive in the browser
+    return term[:SHARD_PREFIX_LENGTH].encode().hex()
+
+def build_search_index(pages) -> tuple[list[dict], dict[str, dict]]:
+    documents = []
+    shards: dict[str, dict[str, list]] = {}
+
+    # Each page's term counts arrive from whichever worker rendered it, so
+    # merging them is a single pass that appends to the postings of each term
+    for document, (url, title, terms) in enumerate(pages):
+        documents.append({"url": url, "title": title})
+
+        for term, count in terms.items():
+            shards.setdefault(shard_name(term), {}).setdefault(term, []).append([document, count])
+
+    return documents, shards
+
+def dump_compact(data):
+    return lambda f: json.dump(data, f, separators=(",", ":"), sort_keys=True)
+
+def write_search_index(directory, documents, shards, changes=None):
+    paths = {"documents.json": dump_compact(documents)}
+
+    for shard, terms in shards.items():
+        paths[os.path.join("terms", f"{shard}.json")] = dump_compact(terms)
+
+    # Compressed siblings of a shard that is still written belong to --precompress, not to the sweep
+    stale = [path for path in list_files(directory) if (compressed_source(path) or path) not in paths]
+
+    for path, write in paths.items():
+        status = write_if_changed(os.path.join(directory, path), write)
+
+        if changes is not None:
+            changes.record(os.path.join(directory, path), status)
+
+    for path in stale:
+        remove_file(directory, path)
+
+        if changes is not None:
+            changes.record(os.path.join(directory, path), "removed")
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+
+# Identical in every shard of a build, so the merged manifest takes them from any one
+SHARED_KEYS = ["generator", "template", "asset_urls", "image_sizes", "minify", "drafts", "fingerprinted_urls"]
+# Also the same in every shard, apart from the asset mtimes of each checkout
+INDEX_KEYS = ["asset_index"]
+# Each shard holds its own slice of these
+UNION_KEYS = ["pages", "metadata", "links", "search", "assets"]
+
+def parse_shard(value) -> tuple[int, int]:
+    index, _, count = value.partition("/")
+
+    if not (index.isdigit() and count.isdigit()) or not 1 <= int(index) <= int(count):
+        raise ValueError(f"Shard must look like i/N with 1 <= i <= N: {value}")
+
+    return int(index), int(count)
+
+def shard_of(path, count) -> int:
+    # Hashing the POSIX form of the path gives every machine the same split,
+    # whatever its OS, file order or PYTHONHASHSEED
+    digest = hashlib.sha256(path.replace(os.sep, "/").encode()).digest()
+
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+def in_shard(path, shard) -> bool:
+    index, count = shard
+
+    return shard_of(path, count) == index
+
+def shard_manifest_path(shard) -> str:
+    return os.path.join(".cache", f"shard-{shard[0]}-of-{shard[1]}.json")
+
+def merge_changes(manifests, changes):
+    # Outputs the merge wrote itself come first, and an output one shard wrote
+    # wins over another shard having removed it
+    for manifest in manifests:
+        for path, status in manifest["changes"].items():
+            if status != "removed":
+                changes.statuses.setdefault(path, status)
+
+    for manifest in manifests:
+        for path, status in manifest["changes"].items():
+            changes.statuses.setdefault(path, status)
+
+def load_shard_manifests(paths) -> list[dict]:
+    manifests = []
+
+    for path in paths:
+        with open(path, "r") as f:
+            manifests.append(json.load(f))
+
+    return manifests
+
+def shard_manifest(shard, current, changes) -> dict:
+    manifest = {key: current[key] for key in SHARED_KEYS + INDEX_KEYS + UNION_KEYS}
+    outputs = sorted(path for path, status in changes.items() if status != "removed")
+
+    # The shard's own delta goes along, so the merge can write the deploy manifest for the whole site
+    return {**manifest, "shard": list(shard), "outputs": outputs, "changes": changes}
+
+def merge_shards(manifests) -> dict:
+    counts = set(manifest["shard"][1] for manifest in manifests)
+
+    if len(counts) != 1:
+        raise ValueError(f"Shard manifests come from different splits: {sorted(counts)}")
+
+    count = counts.pop()
+    indexes = sorted(manifest["shard"][0] for manifest in manifests)
+
+    if indexes != list(range(1, count + 1)):
+        missing = sorted(set(range(1, count + 1)) - set(indexes))
+        repeated = sorted(set(index for index in indexes if indexes.count(index) > 1))
+
+        raise ValueError(f"Expected shards 1..{count} once each, missing {missing}, repeated {repeated}")
+
+    # Every shard renders against the same template, assets and options, or
+    # the merged pages would not agree on the URLs and sizes they embed
+    for key in SHARED_KEYS:
+        if any(manifest[key] != manifests[0][key] for manifest in manifests):
+            raise ValueError(f"Shard manifests disagree on {key}; were they built from the same commit and flags?")
+
+    merged = {key: manifests[0][key] for key in SHARED_KEYS + INDEX_KEYS}
+    merged.update({"pages": {}, "metadata": {}, "links": {}, "search": {}, "assets": []})
+    owners = {"pages": {}, "outputs": {}}
+    collisions = []
+
+    for manifest in sorted(manifests, key=lambda manifest: manifest["shard"][0]):
+        shard = f"{manifest['shard'][0]}/{count}"
+
+        # Two shards rendering the same source, or writing the same output, would
+        # leave whichever copy was unpacked last. Sources and outputs are separate
+        # namespaces, so one shard's source may share a name with another's output.
+        for namespace, namespace_owners in owners.items():
+            for path in manifest[namespace]:
+                if path in namespace_owners:
+                    collisions.append(f"  {path}: {namespace} of shards {namespace_owners[path]} and {shard}")
+                else:
+                    namespace_owners[path] = shard
+
+        for key in ["pages", "metadata", "links", "search"]:
+            merged[key].update(manifest[key])
+
+        merged["assets"].extend(manifest["assets"])
+
+    if collisions:
+        raise ValueError(f"{len(collisions)} collision(s) between shards:\n" + "\n".join(collisions))
+
+    merged["assets"].sort()
+
+    return merged
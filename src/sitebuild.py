@@ -0,0 +1,86 @@
+import io
+import posixpath
+
+from assetindex import read_image_size
+from discovery import DEFAULT_IGNORE, is_ignored
+from links import asset_url, find_broken_links, link_targets, page_url
+from pageindex import PageIndex
+from pagerender import failed_pages_error, prepare_page
+from references import AssetReferences
+from template import compile_template
+
+CONTENT_DIR = "content"
+STATIC_DIR = "static"
+TEMPLATE_PATH = "template.html"
+
+def copy_assets(source, sink, ignore=DEFAULT_IGNORE) -> tuple[list[str], dict[str, list[int]]]:
+    assets = [path for path in source.list_files(STATIC_DIR) if not is_ignored(path, ignore)]
+    image_sizes = {}
+
+    for path in assets:
+        data = source.read_bytes(posixpath.join(STATIC_DIR, path))
+        sink.write_bytes(path, data)
+        size = read_image_size(io.BytesIO(data))
+
+        if size:
+            image_sizes[asset_url(path)] = list(size)
+
+    return assets, image_sizes
+
+def build_site(source, sink, minify=False, ignore=DEFAULT_IGNORE, drafts=False) -> list[tuple[str, str]]:
+    # Every read goes through source and every write through sink, so with
+    # MemoryFileSystem on both ends a whole site renders without touching disk
+    templates = {}
+
+    def load(path, minify):
+        if path not in templates:
+            template = compile_template(path, read_text=source.read_text)
+            templates[path] = template.minified() if minify else template
+
+        return templates[path]
+
+    # The site template has to compile even if every page names its own
+    load(TEMPLATE_PATH, minify)
+
+    assets, image_sizes = copy_assets(source, sink, ignore)
+    references = AssetReferences(".", {}, image_sizes)
+    page_links = {}
+    outputs = []
+    failures = []
+
+    for path in source.list_files(CONTENT_DIR):
+        if not path.endswith(".md") or is_ignored(path, ignore):
+            continue
+
+        from_path = posixpath.join(CONTENT_DIR, path)
+        to_path = path.removesuffix(".md") + ".html"
+        index = PageIndex()
+
+        try:
+            page_references = references.for_page(to_path)
+            prepared = prepare_page(
+                source.read_text(from_path),
+                TEMPLATE_PATH,
+                index=index,
+                minify=minify,
+                drafts=drafts,
+                references=page_references,
+                load=load,
+            )
+
+            if prepared is None:
+                continue
+
+            template, values = prepared
+            sink.write_text(to_path, template.render(values, page_references.rewrite))
+        except Exception as e:
+            failures.append((from_path, repr(e)))
+            continue
+
+        outputs.append(to_path)
+        page_links[from_path] = (page_url(to_path, "."), list(index.links))
+
+    if failures:
+        raise failed_pages_error(failures)
+
+    return find_broken_links(page_links, link_targets(outputs, assets, "."))
@@ -0,0 +1,135 @@
+import fcntl
+import os
+import shutil
+
+from discovery import scan_tree
+from manifest import hash_file
+
+LINK_MODES = ["copy", "hardlink", "reflink"]
+# ioctl request number for FICLONE from linux/fs.h
+FICLONE = 0x40049409
+
+def list_files(directory) -> list[str]:
+    # Everything in an output tree counts, hidden files included
+    return sorted(entry.path for entry in scan_tree(directory, ignore=()))
+
+def is_unchanged(source, destination, checksum=False, source_stat=None) -> bool:
+    try:
+        destination_stat = os.stat(destination)
+    except FileNotFoundError:
+        return False
+
+    source_stat = source_stat or os.stat(source)
+
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+
+    # Hardlinks share the inode, so there is nothing left to compare
+    if source_stat.st_ino == destination_stat.st_ino and source_stat.st_dev == destination_stat.st_dev:
+        return True
+
+    if source_stat.st_mtime_ns != destination_stat.st_mtime_ns:
+        return False
+
+    return not checksum or hash_file(source) == hash_file(destination)
+
+def reflink(source, destination):
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+    shutil.copystat(source, destination)
+
+def transfer(source, destination, link_mode="copy"):
+    if os.path.lexists(destination):
+        os.remove(destination)
+
+    try:
+        match link_mode:
+            case "hardlink":
+                os.link(source, destination)
+                return
+            case "reflink":
+                reflink(source, destination)
+                return
+    except OSError:
+        # Cross-device links and filesystems without reflink support fall back to a copy
+        if os.path.lexists(destination):
+            os.remove(destination)
+
+    shutil.copy2(source, destination)
+
+def remove_file(directory, path):
+    full_path = os.path.join(directory, path)
+
+    if os.path.lexists(full_path):
+        print(f"Removing {full_path}")
+        os.remove(full_path)
+
+    parent = os.path.dirname(path)
+
+    while parent:
+        try:
+            os.rmdir(os.path.join(directory, parent))
+        except OSError:
+            break
+
+        parent = os.path.dirname(parent)
+
+def same_content(source, destination) -> bool:
+    try:
+        return os.path.getsize(source) == os.path.getsize(destination) and hash_file(source) == hash_file(destination)
+    except FileNotFoundError:
+        return False
+
+def is_linked(path, target) -> bool:
+    try:
+        return os.path.samefile(path, target)
+    except FileNotFoundError:
+        return False
+
+def sync_tree(source_dir, destination_dir, previous_files=None, checksum=False, link_mode="copy", changes=None, entries=None, linked=None) -> list[str]:
+    previous_files = previous_files or []
+    linked = linked or {}
+    entries = scan_tree(source_dir) if entries is None else entries
+    files = [entry.path for entry in entries]
+
+    def record(path, status):
+        if changes is not None:
+            changes.record(os.path.join(destination_dir, path), status)
+
+    # Deduplicated copies go last, once their canonical is known to be up to date
+    for entry in sorted(entries, key=lambda entry: entry.path in linked):
+        path = entry.path
+        source = os.path.join(source_dir, path)
+        destination = os.path.join(destination_dir, path)
+
+        # A copy still linked to its canonical's output has that file's content and
+        # mtime, so comparing it to its own source would hash both and touch the shared inode
+        if path in linked and is_linked(destination, os.path.join(destination_dir, linked[path])):
+            record(path, "unchanged")
+            continue
+
+        if is_unchanged(source, destination, checksum, entry.stat):
+            record(path, "unchanged")
+            continue
+
+        # A touched but identical file is not rewritten. It takes the source's mtime,
+        # so the next build sees a match from the stat alone instead of hashing both again
+        if same_content(source, destination):
+            os.utime(destination, ns=(entry.stat.st_atime_ns, entry.stat.st_mtime_ns))
+            record(path, "unchanged")
+            continue
+
+        record(path, "changed" if os.path.lexists(destination) else "added")
+        print(f"Copying {source} to {destination}")
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        transfer(source, destination, link_mode)
+
+    current = set(files)
+
+    for path in previous_files:
+        if path not in current:
+            remove_file(destination_dir, path)
+            record(path, "removed")
+
+    return files
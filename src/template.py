@@ -0,0 +1,198 @@
+import hashlib
+import os
+import re
+from typing import TextIO
+
+from manifest import hash_file
+
+placeholder_regex = re.compile(r"\{\{\s*(>)?\s*([\w.-]+)\s*\}\}")
+PARTIALS_DIR = "partials"
+
+whitespace_regex = re.compile(r"\s+")
+# Elements whose text is shown or run exactly as written
+raw_text_regex = re.compile(r"<(pre|textarea|script|style)\b|</(pre|textarea|script|style)\s*>", re.IGNORECASE)
+# Whitespace around these never renders, so it can go entirely
+block_tag_regex = re.compile(
+    r"\s*(<!DOCTYPE[^>]*>|</?(?:html|head|body|title|meta|link|article|aside|blockquote|div|footer|header|"
+    r"h[1-6]|li|main|nav|ol|p|section|table|tbody|td|th|thead|tr|ul)\b[^>]*>)\s*",
+    re.IGNORECASE,
+)
+start_tag_regex = re.compile(r"<[a-zA-Z][^>]*>")
+quoted_attribute_regex = re.compile(r"(\s[\w-]+)=\"([^\s\"'=<>`]+)\"")
+
+def tag_slots(segments) -> frozenset[int]:
+    inside = False
+    indices = set()
+
+    # The static text before a slot tells whether a start tag is still open there
+    for index, segment in enumerate(segments[:-1]):
+        opened, closed = segment.rfind("<"), segment.rfind(">")
+
+        if opened != closed:
+            inside = opened > closed
+
+        if inside:
+            indices.add(index)
+
+    return frozenset(indices)
+
+class Template():
+    __slots__ = ("segments", "slots", "dependencies", "minify", "tag_slots")
+
+    def __init__(self, segments: list[str], slots: list[str], dependencies: list[str], minify=False) -> None:
+        # Static text surrounds every slot, so there is always one more segment than slots
+        self.segments = segments
+        self.slots = slots
+        self.dependencies = dependencies
+        # Nodes written into the slots are serialized minified too
+        self.minify = minify
+        # Slots that fill an attribute value rather than text
+        self.tag_slots = tag_slots(segments)
+
+    def minified(self) -> "Template":
+        return Template(minify_segments(self.segments), self.slots, self.dependencies, True)
+
+    def render_to(self, f: TextIO, values: dict, rewrite=None):
+        for part in self.iter_parts(values, rewrite):
+            if isinstance(part, str):
+                f.write(part)
+            else:
+                part.write_to(f, self.minify)
+
+    def render(self, values: dict, rewrite=None) -> str:
+        return "".join(self.iter_render(values, rewrite))
+
+    def iter_render(self, values: dict, rewrite=None):
+        for part in self.iter_parts(values, rewrite):
+            if isinstance(part, str):
+                yield part
+            else:
+                yield from part.iter_html(self.minify)
+
+    def iter_parts(self, values: dict, rewrite=None):
+        # Only static text goes through rewrite, so a title or other front matter
+        # that reads like HTML is written as given. A value inside a start tag is
+        # joined with the tag around it, so its attribute is rewritten whole.
+        text = self.segments[0]
+
+        for index, (slot, segment) in enumerate(zip(self.slots, self.segments[1:])):
+            value = values.get(slot, "")
+
+            if index in self.tag_slots and isinstance(value, str):
+                text += value + segment
+                continue
+
+            yield rewrite(text) if rewrite else text
+            yield value
+            text = segment
+
+        yield rewrite(text) if rewrite else text
+
+def read_file(path) -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+def compile_template(path, partials_dir=None, including=(), read_text=read_file) -> Template:
+    partials_dir = partials_dir or os.path.join(os.path.dirname(path), PARTIALS_DIR)
+
+    if path in including:
+        raise ValueError(f"Template partial includes itself: {path}")
+
+    source = read_text(path)
+
+    segments = [""]
+    slots = []
+    dependencies = [path]
+    position = 0
+
+    for match in placeholder_regex.finditer(source):
+        segments[-1] += source[position:match.start()]
+        position = match.end()
+        is_partial, name = match.groups()
+
+        if is_partial:
+            # Partials are inlined at compile time so rendering never touches them again
+            partial_path = os.path.join(partials_dir, f"{name}.html")
+            partial = compile_template(partial_path, partials_dir, (*including, path), read_text)
+
+            segments[-1] += partial.segments[0]
+            segments.extend(partial.segments[1:])
+            slots.extend(partial.slots)
+            dependencies.extend(partial.dependencies)
+        else:
+            slots.append(name)
+            segments.append("")
+
+    segments[-1] += source[position:]
+
+    return Template(segments, slots, dependencies)
+
+def unquote_attributes(match) -> str:
+    return quoted_attribute_regex.sub(r"\1=\2", match[0])
+
+def minify_text(text) -> str:
+    text = block_tag_regex.sub(r"\1", whitespace_regex.sub(" ", text))
+
+    return start_tag_regex.sub(unquote_attributes, text)
+
+def minify_segments(segments) -> list[str]:
+    minified = []
+    # A raw text element opened in one segment can close after a slot, in a later one
+    raw = None
+
+    for segment in segments:
+        parts = []
+        position = 0
+
+        for match in raw_text_regex.finditer(segment):
+            opening, closing = match.groups()
+
+            if raw is None and opening:
+                parts.append(minify_text(segment[position:match.start()]))
+                position = match.start()
+                raw = opening.lower()
+            elif raw is not None and closing and closing.lower() == raw:
+                parts.append(segment[position:match.end()])
+                position = match.end()
+                raw = None
+
+        rest = segment[position:]
+        parts.append(rest if raw else minify_text(rest))
+        minified.append("".join(parts))
+
+    return minified
+
+template_cache: dict[tuple[str, bool], tuple[list[int], Template]] = {}
+
+def dependency_mtimes(dependencies) -> list[int]:
+    return [os.stat(path).st_mtime_ns for path in dependencies]
+
+def load_template(path, minify=False) -> Template:
+    path = os.path.normpath(path)
+    cached = template_cache.get((path, minify))
+
+    if cached:
+        mtimes, template = cached
+
+        try:
+            if dependency_mtimes(template.dependencies) == mtimes:
+                return template
+        except FileNotFoundError:
+            pass
+
+    template = compile_template(path)
+
+    if minify:
+        template = template.minified()
+
+    template_cache[(path, minify)] = (dependency_mtimes(template.dependencies), template)
+
+    return template
+
+def hash_template(path) -> str:
+    digest = hashlib.sha256()
+
+    for dependency in load_template(path).dependencies:
+        digest.update(hash_file(dependency).encode())
+
+    return digest.hexdigest()
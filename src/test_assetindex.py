@@ -0,0 +1,89 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+from assetindex import find_duplicates, image_size, index_assets, link_duplicates
+from discovery import scan_tree
+
+def png(width, height) -> bytes:
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + header + struct.pack(">I", zlib.crc32(b"IHDR" + header))
+
+def jpeg(width, height) -> bytes:
+    app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    frame = struct.pack(">BHHB", 8, height, width, 3) + b"\x01\x22\x00" * 3
+
+    return (
+        b"\xff\xd8" +
+        b"\xff\xe0" + struct.pack(">H", len(app0) + 2) + app0 +
+        b"\xff\xc2" + struct.pack(">H", len(frame) + 2) + frame +
+        b"\xff\xda" + b"\x00" * 16
+    )
+
+def webp(chunk, payload) -> bytes:
+    return b"RIFF" + struct.pack("<I", 4 + 8 + len(payload)) + b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+
+class TestAssetIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, path, data: bytes):
+        path = os.path.join(self.directory.name, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "wb") as f:
+            f.write(data)
+
+        return path
+
+    image_size_cases = [
+        (png(640, 480), (640, 480)),
+        (b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 20, (32, 16)),
+        (jpeg(1024, 768), (1024, 768)),
+        (webp(b"VP8 ", b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 300, 200) + b"\x00" * 8), (300, 200)),
+        (webp(b"VP8L", b"\x2f" + ((299) | (199 << 14)).to_bytes(4, "little") + b"\x00" * 8), (300, 200)),
+        (webp(b"VP8X", b"\x00" * 4 + (299).to_bytes(3, "little") + (199).to_bytes(3, "little")), (300, 200)),
+        (b"body { color: red }" * 4, None),
+        (b"tiny", None),
+    ]
+
+    def test_image_size(self):
+        for data, expected in self.image_size_cases:
+            self.assertEqual(image_size(self.write("image", data)), expected)
+
+    def test_index_assets_reuses_unchanged_entries(self):
+        static = os.path.join(self.directory.name, "static")
+        self.write(os.path.join("static", "a.png"), png(10, 20))
+        self.write(os.path.join("static", "index.css"), b"body {}")
+
+        index = index_assets(static, scan_tree(static))
+
+        self.assertEqual((index["a.png"]["width"], index["a.png"]["height"]), (10, 20))
+        self.assertIsNone(index["index.css"]["width"])
+
+        # Unchanged size and mtime trust the cached entry instead of reading the file
+        index["a.png"]["width"] = 99
+        self.assertEqual(index_assets(static, scan_tree(static), index)["a.png"]["width"], 99)
+
+    def test_duplicates(self):
+        public = os.path.join(self.directory.name, "public")
+        self.write(os.path.join("public", "images", "a.png"), png(10, 20))
+        self.write(os.path.join("public", "copies", "a.png"), png(10, 20))
+        self.write(os.path.join("public", "images", "b.png"), png(20, 10))
+        self.write(os.path.join("public", "a.css"), b"body {}")
+        self.write(os.path.join("public", "b.css"), b"body {}")
+
+        duplicates = find_duplicates(index_assets(public, scan_tree(public)))
+
+        self.assertEqual(duplicates, [[os.path.join("copies", "a.png"), os.path.join("images", "a.png")]])
+        self.assertEqual(link_duplicates(public, duplicates), {"/images/a.png": "/copies/a.png"})
+        self.assertTrue(os.path.samefile(os.path.join(public, "copies", "a.png"), os.path.join(public, "images", "a.png")))
+
+if __name__ == "__main__":
+    unittest.main()
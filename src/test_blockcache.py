@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+from blockcache import BlockCache
+from orchestration import markdown_to_html_node
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_and_put(self):
+        cache = BlockCache(self.directory.name, 1024, "v1")
+
+        self.assertIsNone(cache.get("# Heading"))
+
+        cache.put("# Heading", {"html": "<h1>Heading</h1>"})
+
+        self.assertEqual(cache.get("# Heading"), {"html": "<h1>Heading</h1>"})
+        self.assertIsNone(BlockCache(self.directory.name, 1024, "v2").get("# Heading"))
+
+    def test_evict_least_recently_used(self):
+        cache = BlockCache(self.directory.name, 0, "v1")
+
+        for index, block in enumerate(["first", "second", "third"]):
+            cache.put(block, {"html": block * 10})
+            path = cache.path(cache.key(block))
+            os.utime(path, ns=(index, index))
+
+        entry_size = os.path.getsize(cache.path(cache.key("first")))
+        cache.max_bytes = entry_size * 2
+        os.utime(cache.path(cache.key("first")), ns=(10, 10))
+
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get("second"))
+        self.assertIsNotNone(cache.get("first"))
+        self.assertIsNotNone(cache.get("third"))
+
+    def test_markdown_to_html_node_with_cache(self):
+        cache = BlockCache(self.directory.name, 1024 * 1024, "v1", min_block_size=0)
+        doc = "# Title\n\nSome *text*\n\n- one\n- `two`"
+        expected = markdown_to_html_node(doc).to_html()
+
+        self.assertEqual(markdown_to_html_node(doc, cache=cache).to_html(), expected)
+        self.assertEqual(len(cache.entries()), 3)
+
+        cache.put("Some *text*", {"html": "<p>from the cache</p>"})
+
+        self.assertEqual(
+            markdown_to_html_node(doc, cache=cache).to_html(),
+            expected.replace("<p>Some <i>text</i></p>", "<p>from the cache</p>")
+        )
+
+    def test_minified_fragments_are_cached_apart(self):
+        doc = "# Title\n\n[home](/)"
+        plain = BlockCache(self.directory.name, 1024 * 1024, "v1", min_block_size=0)
+        minified = BlockCache(self.directory.name, 1024 * 1024, "v1", min_block_size=0, minify=True)
+
+        self.assertEqual(markdown_to_html_node(doc, cache=plain).to_html(), markdown_to_html_node(doc).to_html())
+        self.assertEqual(
+            markdown_to_html_node(doc, cache=minified).to_html(minify=True),
+            markdown_to_html_node(doc).to_html(minify=True)
+        )
+        self.assertEqual(len(plain.entries()), 4)
+
+    def test_small_blocks_skip_the_cache(self):
+        cache = BlockCache(self.directory.name, 1024 * 1024, "v1", min_block_size=16)
+        markdown_to_html_node("# Title\n\nA paragraph long enough to be cached", cache=cache)
+
+        self.assertEqual(len(cache.entries()), 1)
+
+if __name__ == "__main__":
+    unittest.main()
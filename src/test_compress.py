@@ -0,0 +1,65 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import compressed_source, precompress_tree
+from outputs import OutputChanges
+from sync import list_files
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.directory.name, "public")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_compressed_source(self):
+        compressed_cases = [
+            ("index.html.gz", "index.html"),
+            ("index.css.br", "index.css"),
+            ("archive.tar.gz", None),
+            ("index.html", None),
+        ]
+
+        for path, expected in compressed_cases:
+            self.assertEqual(compressed_source(path), expected)
+
+    def test_precompress_tree(self):
+        page = os.path.join(self.public, "index.html")
+        self.write(page, "<p>hello</p>" * 100)
+        self.write(os.path.join(self.public, "a.png"), "png")
+        self.write(os.path.join(self.public, "gone.html.gz"), "stale")
+
+        changes = OutputChanges(self.public)
+        precompress_tree(self.public, list_files(self.public), jobs=2, changes=changes)
+
+        with gzip.open(page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 100)
+
+        self.assertNotIn("gone.html.gz", list_files(self.public))
+        self.assertIn("index.html.gz", changes.paths("added"))
+        self.assertEqual(changes.paths("removed"), ["gone.html.gz"])
+
+        # Untouched sources are not compressed again
+        changes = OutputChanges(self.public)
+        precompress_tree(self.public, list_files(self.public), changes=changes)
+
+        self.assertEqual(changes.to_dict(), {"added": [], "changed": [], "removed": []})
+        self.assertIn("index.html.gz", changes.paths("unchanged"))
+
+        self.write(page, "<p>bye</p>")
+        precompress_tree(self.public, list_files(self.public))
+
+        with gzip.open(page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>bye</p>")
+
+if __name__ == "__main__":
+    unittest.main()
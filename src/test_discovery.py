@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from discovery import DEFAULT_IGNORE, SiteFiles, discover, is_ignored, scan_tree
+
+class TestDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.directory.name, "content")
+        self.static = os.path.join(self.directory.name, "static")
+
+        for path in [
+            os.path.join(self.content, "index.md"),
+            os.path.join(self.content, ".index.md.swp"),
+            os.path.join(self.content, "blog", "post.md"),
+            os.path.join(self.content, "blog", "post.md~"),
+            os.path.join(self.content, "blog", "notes.txt"),
+            os.path.join(self.content, "drafts", "secret.md"),
+            os.path.join(self.static, ".well-known", "security.txt"),
+            os.path.join(self.static, "index.css"),
+        ]:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            with open(path, "w") as f:
+                f.write(path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    is_ignored_cases = [
+        (".index.md.swp", DEFAULT_IGNORE, True),
+        (os.path.join("blog", "post.md~"), DEFAULT_IGNORE, True),
+        (os.path.join("blog", ".#post.md"), DEFAULT_IGNORE, True),
+        (os.path.join("blog", "post.md"), DEFAULT_IGNORE, False),
+        (".htaccess", DEFAULT_IGNORE, False),
+        (os.path.join("drafts", "secret.md"), ["drafts/*"], True),
+        ("drafts", ["drafts"], True),
+        (os.path.join("blog", "drafts"), ["drafts/*"], False),
+    ]
+
+    def test_is_ignored(self):
+        for path, ignore, expected in self.is_ignored_cases:
+            self.assertEqual(is_ignored(path, ignore), expected)
+
+    def test_scan_tree(self):
+        entries = scan_tree(self.content)
+
+        self.assertEqual(
+            [entry.path for entry in entries],
+            [
+                os.path.join("blog", "notes.txt"),
+                os.path.join("blog", "post.md"),
+                os.path.join("drafts", "secret.md"),
+                "index.md",
+            ]
+        )
+        self.assertEqual(entries[-1].stat, os.stat(os.path.join(self.content, "index.md")))
+        self.assertEqual(scan_tree(os.path.join(self.directory.name, "missing")), [])
+
+    def test_discover(self):
+        site = discover(self.content, self.static, (*DEFAULT_IGNORE, "drafts"))
+
+        self.assertEqual([entry.path for entry in site.pages], [os.path.join("blog", "post.md"), "index.md"])
+        self.assertEqual([entry.path for entry in site.assets], [os.path.join(".well-known", "security.txt"), "index.css"])
+        self.assertEqual(site, SiteFiles(site.pages, site.assets))
+
+if __name__ == "__main__":
+    unittest.main()
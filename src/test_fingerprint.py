@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from assetindex import index_assets
+from discovery import scan_tree
+from fingerprint import fingerprint_assets, fingerprinted_path
+from outputs import OutputChanges
+from sync import list_files
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.directory.name, "static")
+        self.public = os.path.join(self.directory.name, "public")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path(os.path.join("images", "a.png"), "0123456789abcdef"), os.path.join("images", "a.0123456789ab.png"))
+        self.assertEqual(fingerprinted_path("LICENSE", "0123456789abcdef"), "LICENSE.0123456789ab")
+
+    def test_fingerprint_assets(self):
+        css = "index.css"
+        image = os.path.join("images", "a.png")
+        self.write(os.path.join(self.static, css), "body {}")
+        self.write(os.path.join(self.static, image), "png")
+
+        asset_index = index_assets(self.static, scan_tree(self.static))
+        urls = fingerprint_assets(self.static, self.public, asset_index)
+        css_fingerprinted = fingerprinted_path(css, asset_index[css]["digest"])
+        image_fingerprinted = fingerprinted_path(image, asset_index[image]["digest"])
+
+        self.assertEqual(list_files(self.public), sorted([css_fingerprinted, image_fingerprinted]))
+        self.assertEqual(urls, {"/index.css": f"/{css_fingerprinted}", "/images/a.png": f"/images/{os.path.basename(image_fingerprinted)}"})
+
+        # A changed asset gets a new name and the old copy is removed
+        self.write(os.path.join(self.static, css), "body { color: red }")
+        changes = OutputChanges(self.public)
+        asset_index = index_assets(self.static, scan_tree(self.static), asset_index)
+        updated = fingerprint_assets(self.static, self.public, asset_index, urls, changes=changes)
+        updated_fingerprinted = fingerprinted_path(css, asset_index[css]["digest"])
+
+        self.assertNotEqual(updated_fingerprinted, css_fingerprinted)
+        self.assertEqual(updated["/images/a.png"], urls["/images/a.png"])
+        self.assertEqual(changes.to_dict(), {"added": [updated_fingerprinted], "changed": [], "removed": [css_fingerprinted]})
+
+if __name__ == "__main__":
+    unittest.main()
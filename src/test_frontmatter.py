@@ -0,0 +1,53 @@
+import io
+import unittest
+
+from frontmatter import page_metadata, read_front_matter, template_values
+from orchestration import extract_title, split_page
+
+class TestFrontMatter(unittest.TestCase):
+    read_cases = [
+        ("# Title\n\nBody\n", {}, "# Title\n\nBody\n"),
+        (
+            "---\ntitle: 'Hello: world'\ndate: 2024-01-02\ntags: [a, \"b c\"]\ndraft: yes\n---\n# Body\n",
+            {"title": "Hello: world", "date": "2024-01-02", "tags": ["a", "b c"], "draft": True},
+            "# Body\n",
+        ),
+        ("---\n# a comment\nTags: x, y,\nlayout: wide\n---\n", {"tags": ["x", "y"], "layout": "wide"}, ""),
+        ("", {}, ""),
+    ]
+
+    def test_read_front_matter(self):
+        for doc, metadata, rest in self.read_cases:
+            front_matter, lines = read_front_matter(io.StringIO(doc))
+
+            self.assertEqual(front_matter, metadata)
+            self.assertEqual("".join(lines), rest)
+
+    invalid_cases = [
+        "---\ntitle: Open\n",
+        "---\nno colon here\n---\n",
+        "---\ndate: 2024-13-01\n---\n",
+        "---\ndraft: maybe\n---\n",
+    ]
+
+    def test_read_front_matter_rejects_invalid(self):
+        for doc in self.invalid_cases:
+            with self.assertRaises(ValueError):
+                read_front_matter(io.StringIO(doc))
+
+    def test_title_prefers_front_matter(self):
+        self.assertEqual(extract_title("---\ntitle: Given\n---\n\n# Heading"), "Given")
+        self.assertEqual(extract_title("```\n# not a title\n```\n\n# Heading"), "Heading")
+
+        front_matter, blocks = split_page(io.StringIO("---\ntags: a\n---\n\n# Heading\n\nText"))
+
+        self.assertEqual(front_matter, {"tags": ["a"]})
+        self.assertEqual(list(blocks), ["# Heading", "Text"])
+
+    def test_template_values(self):
+        metadata = page_metadata({"tags": ["a", "b"], "author": "Tolkien", "draft": True}, "Title")
+
+        self.assertEqual(template_values(metadata), {"Title": "Title", "Tags": "a, b", "Author": "Tolkien"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import EMPTY_PROPS, HTMLNode, LeafNode, ParentNode
 
 class TestHTMLNode(unittest.TestCase):
     props_to_html_cases = [
@@ -80,6 +81,19 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(repr(node), "HTMLNode(b, Some text, [], {})")
 
 
+    def test_compact_representation(self):
+        node = LeafNode("b", "Some text")
+        other = ParentNode("".join(["d", "iv"]), [node])
+
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertIs(node.props, EMPTY_PROPS)
+        self.assertIs(other.props, EMPTY_PROPS)
+        self.assertIs(other.tag, "div")
+
+        with self.assertRaises(TypeError):
+            node.props["class"] = "oops"
+
+
 class TestLeafNode(unittest.TestCase):
     to_html = [
         (
@@ -169,5 +183,49 @@ class TestParentNode(unittest.TestCase):
 
             self.assertEqual(result, expected_html)
 
+    def test_write_to(self):
+        for node, expected_html in self.to_html_cases:
+            f = io.StringIO()
+
+            try:
+                node.write_to(f)
+                result = f.getvalue()
+            except Exception as e:
+                result = repr(e)
+
+            self.assertEqual(result, expected_html)
+
+    minify_cases = [
+        (
+            ParentNode("p", [LeafNode("a", "Home", {"href": "/", "title": "Back home"})]),
+            '<p><a href=/ title="Back home">Home</a></p>'
+        ),
+        (
+            LeafNode("img", "", {"src": "/images/rivendell.png", "alt": ""}),
+            '<img src=/images/rivendell.png alt="">'
+        ),
+        (
+            ParentNode("pre", [LeafNode("code", "x = \"1\"\n\n    y")], {"class": "highlight-source-python"}),
+            '<pre class=highlight-source-python><code>x = "1"\n\n    y</code></pre>'
+        ),
+    ]
+
+    def test_minify(self):
+        for node, expected_html in self.minify_cases:
+            f = io.StringIO()
+            node.write_to(f, minify=True)
+
+            self.assertEqual(node.to_html(minify=True), expected_html)
+            self.assertEqual(f.getvalue(), expected_html)
+
+    def test_iter_html_streams_children(self):
+        items = [ParentNode("li", [LeafNode(None, f"item {i}")]) for i in range(3)]
+        chunks = list(ParentNode("ul", items).iter_html())
+
+        self.assertEqual(
+            chunks,
+            ["<ul>", "<li>", "item 0", "</li>", "<li>", "item 1", "</li>", "<li>", "item 2", "</li>", "</ul>"]
+        )
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+import os
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from links import find_broken_links, is_internal, link_targets, page_url, resolve
+from orchestration import markdown_to_html_node
+from pageindex import PageIndex, index_block
+
+class TestLinks(unittest.TestCase):
+    is_internal_cases = [
+        ("/majesty", True),
+        ("images/rivendell.png", True),
+        ("../index.html#top", True),
+        ("https://boot.dev", False),
+        ("//cdn.example.com/lib.js", False),
+        ("mailto:someone@example.com", False),
+        ("#section", False),
+    ]
+
+    def test_is_internal(self):
+        for url, expected in self.is_internal_cases:
+            self.assertEqual(is_internal(url), expected)
+
+    resolve_cases = [
+        ("/images/rivendell.png", "/majesty/", "/images/rivendell.png"),
+        ("../images/rivendell.png", "/majesty/", "/images/rivendell.png"),
+        ("notes.html?page=2#top", "/majesty/", "/majesty/notes.html"),
+        ("/majesty/", "/", "/majesty/"),
+        ("/", "/majesty/", "/"),
+        ("/with%20space.png", "/", "/with space.png"),
+    ]
+
+    def test_resolve(self):
+        for url, base_url, expected in self.resolve_cases:
+            self.assertEqual(resolve(url, base_url), expected)
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("public", "index.html"), "public"), "/")
+        self.assertEqual(page_url(os.path.join("public", "majesty", "index.html"), "public"), "/majesty/")
+        self.assertEqual(page_url(os.path.join("public", "about.html"), "public"), "/about.html")
+
+    def test_find_broken_links(self):
+        targets = link_targets(
+            [os.path.join("public", "index.html"), os.path.join("public", "majesty", "index.html")],
+            [os.path.join("images", "rivendell.png")],
+            "public",
+        )
+        page_links = {
+            "content/index.md": ("/", ["/majesty", "/majesty/", "https://boot.dev", "/gone"]),
+            "content/majesty/index.md": ("/majesty/", ["/", "../images/rivendell.png", "rivendell.png"]),
+        }
+
+        self.assertEqual(
+            find_broken_links(page_links, targets),
+            [("content/index.md", "/gone"), ("content/majesty/index.md", "rivendell.png")]
+        )
+
+    def test_index_collects_links_while_rendering(self):
+        index = PageIndex()
+        markdown_to_html_node("# Home\n\n[a](/a) ![b](/b.png)\n\n- [a](/a)\n- [c](/c)", index=index)
+
+        self.assertEqual(list(index.links), ["/a", "/b.png", "/c"])
+        self.assertEqual(
+            index_block(ParentNode("p", [LeafNode("a", "home", {"href": "/x"}), LeafNode(None, " page")])),
+            {"links": ["/x"], "terms": {"home": 1, "page": 1}}
+        )
+
+if __name__ == "__main__":
+    unittest.main()
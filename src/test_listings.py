@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+
+from frontmatter import page_metadata
+from listings import Listing, collect_listings, generate_listings, tag_slug
+from outputs import OutputChanges
+
+def site(*posts):
+    pages = {}
+    metadata = {}
+
+    for path, front_matter in posts:
+        from_path = os.path.join("content", path)
+        pages[from_path] = {"output": os.path.join("public", path.removesuffix(".md") + ".html")}
+        metadata[from_path] = page_metadata(front_matter, front_matter.get("title", path))
+
+    return pages, metadata
+
+class TestListings(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.directory.name, "public")
+        self.template = os.path.join(self.directory.name, "template.html")
+
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, path):
+        with open(path, "r") as f:
+            return f.read()
+
+    def test_collect_listings(self):
+        pages, metadata = site(
+            ("index.md", {"title": "Home"}),
+            ("blog/index.md", {"title": "Blog"}),
+            ("blog/old.md", {"title": "Old", "date": "2023-05-01", "tags": ["Lord of the Rings"]}),
+            ("blog/new.md", {"title": "New", "date": "2024-01-02", "tags": ["lord of the rings"]}),
+            ("blog/undated.md", {"title": "Undated"}),
+            ("blog/wip.md", {"title": "Wip", "draft": True, "tags": ["wip"]}),
+        )
+        listings = collect_listings(pages, metadata, "content", "public", page_size=2)
+
+        self.assertEqual(listings, [
+            Listing(
+                "All pages",
+                os.path.join("public", "all", "index.html"),
+                [("/blog/new.html", "New", "2024-01-02"), ("/blog/old.html", "Old", "2023-05-01")],
+                older_url="/all/2/",
+            ),
+            Listing(
+                "All pages (page 2)",
+                os.path.join("public", "all", "2", "index.html"),
+                [("/blog/", "Blog", None), ("/blog/undated.html", "Undated", None)],
+                newer_url="/all/",
+            ),
+            Listing(
+                "blog",
+                os.path.join("public", "blog", "all", "index.html"),
+                [("/blog/new.html", "New", "2024-01-02"), ("/blog/old.html", "Old", "2023-05-01")],
+                older_url="/blog/all/2/",
+            ),
+            Listing(
+                "blog (page 2)",
+                os.path.join("public", "blog", "all", "2", "index.html"),
+                [("/blog/undated.html", "Undated", None)],
+                newer_url="/blog/all/",
+            ),
+            Listing(
+                "Tagged Lord of the Rings",
+                os.path.join("public", "tags", "lord-of-the-rings", "index.html"),
+                [("/blog/new.html", "New", "2024-01-02"), ("/blog/old.html", "Old", "2023-05-01")],
+            ),
+        ])
+
+    def test_collect_listings_rejects_clashes(self):
+        pages, metadata = site(("all/index.md", {}), ("post.md", {}))
+
+        with self.assertRaisesRegex(ValueError, "overwrite"):
+            collect_listings(pages, metadata, "content", "public")
+
+    def test_tag_slug(self):
+        for tag, expected in [("Python", "python"), ("C++ & Rust", "c-rust"), ("élan vital", "élan-vital"), ("!!", "-")]:
+            self.assertEqual(tag_slug(tag), expected)
+
+    def test_generate_listings_writes_only_changed_listings(self):
+        def listings(*titles):
+            return [
+                Listing(title, os.path.join(self.public, "tags", title, "index.html"), [("/a.html", "A", "2024-01-02")])
+                for title in titles
+            ]
+
+        changes = OutputChanges(self.public)
+        previous = generate_listings(listings("a", "b"), self.template, {}, self.public, changes=changes)
+        a = os.path.join(self.public, "tags", "a", "index.html")
+
+        self.assertEqual(changes.paths("added"), [os.path.join("tags", "a", "index.html"), os.path.join("tags", "b", "index.html")])
+        self.assertEqual(
+            self.read(a),
+            '<title>a</title><div><ul><li><a href="/a.html">A</a> <time datetime="2024-01-02">2024-01-02</time></li></ul></div>',
+        )
+
+        # An unchanged listing is not even rendered, and a listing that is gone is removed
+        os.utime(a, ns=(0, 0))
+        changes = OutputChanges(self.public)
+        generate_listings(listings("a"), self.template, previous, self.public, changes=changes)
+
+        self.assertEqual(os.stat(a).st_mtime_ns, 0)
+        self.assertEqual(changes.paths("removed"), [os.path.join("tags", "b", "index.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "tags", "b")))
+
+if __name__ == "__main__":
+    unittest.main()
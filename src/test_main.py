@@ -0,0 +1,214 @@
+import contextlib
+import os
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+import main
+from main import RenderOptions, check_links, find_pages, generate_pages, generate_pages_incremental, page_failures
+from manifest import empty_manifest
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.directory.name, "content")
+        self.public = os.path.join(self.directory.name, "public")
+        self.template = os.path.join(self.directory.name, "template.html")
+
+        self.write(self.template, "<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome *home*")
+        self.write(os.path.join(self.content, "blog", "nested", "post.md"), "# Post\n\n- one\n- two")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path, "r") as f:
+            return f.read()
+
+    def test_find_pages(self):
+        self.assertEqual(
+            find_pages(self.content, self.public),
+            [
+                (
+                    os.path.join(self.content, "blog", "nested", "post.md"),
+                    os.path.join(self.public, "blog", "nested", "post.html"),
+                ),
+                (
+                    os.path.join(self.content, "index.md"),
+                    os.path.join(self.public, "index.html"),
+                ),
+            ]
+        )
+
+    def test_generate_pages_parallel_matches_serial(self):
+        pages = find_pages(self.content, self.public)
+
+        self.assertEqual(page_failures(generate_pages(pages, self.template, jobs=1)), [])
+        serial = list(map(lambda page: self.read(page[1]), pages))
+
+        self.assertEqual(page_failures(generate_pages(pages, self.template, jobs=4)), [])
+        parallel = list(map(lambda page: self.read(page[1]), pages))
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(serial[1], "<title>Home</title><main><div><h1>Home</h1><p>Welcome <i>home</i></p></div></main>")
+
+    def test_generate_pages_overlapped_io_matches_serial(self):
+        pages = find_pages(self.content, self.public)
+        generate_pages(pages, self.template)
+        serial = list(map(lambda page: self.read(page[1]), pages))
+
+        for jobs in [1, 2]:
+            results = generate_pages(pages, self.template, jobs=jobs, options=RenderOptions(io_threads=2))
+
+            self.assertEqual(page_failures(results), [])
+            self.assertEqual(list(map(lambda page: self.read(page[1]), pages)), serial)
+
+    def test_generate_pages_reports_every_failure(self):
+        self.write(os.path.join(self.content, "broken.md"), "no title here")
+        self.write(os.path.join(self.content, "unbalanced.md"), "# Title\n\nsome *text")
+        pages = find_pages(self.content, self.public)
+
+        for jobs, io_threads in [(1, 0), (3, 0), (1, 2), (3, 2)]:
+            results = generate_pages(pages, self.template, jobs=jobs, options=RenderOptions(io_threads=io_threads))
+            failures = page_failures(results)
+
+            self.assertEqual(
+                failures,
+                [
+                    (os.path.join(self.content, "broken.md"), "ValueError('Missing title from markdown document')"),
+                    (os.path.join(self.content, "unbalanced.md"), "ValueError('Unbalanced inline markdown node')"),
+                ]
+            )
+
+    def test_generate_pages_profiled(self):
+        pages = find_pages(self.content, self.public)
+
+        for jobs in [1, 2]:
+            results = generate_pages(pages, self.template, jobs=jobs, options=RenderOptions(profiled=True))
+            profile = results[1].profile
+
+            self.assertEqual(profile.path, os.path.join(self.content, "index.md"))
+            self.assertEqual(
+                sorted(profile.stages),
+                sorted(["read", "extract_title", "split_blocks", "parse_blocks", "parse_inline", "serialize", "write"])
+            )
+            self.assertEqual(profile.nodes, 6)
+            self.assertEqual(profile.bytes_out, os.path.getsize(os.path.join(self.public, "index.html")))
+
+        self.assertIsNone(generate_pages(pages, self.template)[0].profile)
+
+    def test_generate_pages_streaming_matches_in_memory(self):
+        self.write(
+            os.path.join(self.content, "code.md"),
+            "Intro before the title\n\n# Code\n\n```python\ndef a():\n\n    pass\n```\n\n- done"
+        )
+        pages = find_pages(self.content, self.public)
+        generate_pages(pages, self.template)
+        in_memory = list(map(lambda page: self.read(page[1]), pages))
+
+        for io_threads in [0, 2]:
+            results = generate_pages(pages, self.template, options=RenderOptions(io_threads=io_threads, stream_threshold=0))
+
+            self.assertEqual(page_failures(results), [])
+            self.assertEqual(list(map(lambda page: self.read(page[1]), pages)), in_memory)
+
+    def test_generate_pages_streaming_memory_is_bounded(self):
+        source = os.path.join(self.content, "huge.md")
+        paragraph = "Some *generated* text with a [link](/somewhere) in it. " * 20
+
+        with open(source, "w") as f:
+            f.write("# Huge\n\n")
+
+            for _ in range(1000):
+                f.write(f"{paragraph}\n\n")
+
+        to_path = os.path.join(self.public, "huge.html")
+        tracemalloc.start()
+        results = generate_pages([(source, to_path)], self.template, options=RenderOptions(stream_threshold=0))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertEqual(page_failures(results), [])
+        self.assertGreater(os.path.getsize(source), 1_000_000)
+        self.assertLess(peak, 250_000)
+
+    def test_check_links_skips_unpublished_drafts(self):
+        manifest = {
+            **empty_manifest(),
+            "pages": {
+                "content/index.md": {"output": os.path.join("public", "index.html")},
+                "content/secret.md": {"output": os.path.join("public", "secret.html")},
+            },
+            "links": {"content/index.md": ["/secret.html"]},
+            "metadata": {"content/secret.md": {"draft": True}},
+        }
+
+        with contextlib.redirect_stdout(None):
+            self.assertEqual(check_links(manifest), [("content/index.md", "/secret.html")])
+            self.assertEqual(check_links({**manifest, "drafts": True}), [])
+
+    def test_page_templates_are_hashed_once_per_build(self):
+        self.write(os.path.join(self.directory.name, "post.html"), "{{ Content }}")
+
+        for name in ["a", "b", "c"]:
+            self.write(os.path.join(self.content, f"{name}.md"), f"---\ntemplate: post.html\n---\n\n# {name}")
+
+        pages = find_pages(self.content, self.public)
+        current, _ = generate_pages_incremental(pages, self.template, empty_manifest())
+
+        # Once for the site template and once for the template the three pages share
+        with mock.patch("main.hash_template", wraps=main.hash_template) as hash_template:
+            generate_pages_incremental(pages, self.template, current)
+
+        self.assertEqual(hash_template.call_count, 2)
+
+    def test_front_matter(self):
+        self.write(os.path.join(self.directory.name, "post.html"), "<h1>{{ Title }}</h1><p>{{ Date }} {{ Tags }}</p>{{ Content }}")
+        self.write(
+            os.path.join(self.content, "blog", "hello.md"),
+            "---\ntitle: Hello\ndate: 2024-01-02\ntags: [a, b]\ntemplate: post.html\n---\n\nFirst *post*",
+        )
+        self.write(os.path.join(self.content, "blog", "wip.md"), "---\ndraft: true\n---\n\n# Not yet")
+        pages = find_pages(self.content, self.public)
+        hello = os.path.join(self.public, "blog", "hello.html")
+        wip = os.path.join(self.public, "blog", "wip.html")
+
+        for options in [RenderOptions(), RenderOptions(io_threads=2), RenderOptions(stream_threshold=0)]:
+            current, results = generate_pages_incremental(pages, self.template, empty_manifest(), options=options)
+
+            self.assertEqual(page_failures(results), [])
+            self.assertEqual(self.read(hello), "<h1>Hello</h1><p>2024-01-02 a, b</p><div><p>First <i>post</i></p></div>")
+            self.assertFalse(os.path.exists(wip))
+
+        metadata = current["metadata"]
+
+        self.assertEqual(
+            metadata[os.path.join(self.content, "blog", "hello.md")],
+            {"title": "Hello", "date": "2024-01-02", "tags": ["a", "b"], "draft": False, "template": "post.html"},
+        )
+        self.assertTrue(metadata[os.path.join(self.content, "blog", "wip.md")]["draft"])
+        self.assertNotIn(os.path.join(self.content, "blog", "wip.md"), current["search"])
+
+        # Nothing is re-rendered, unchanged drafts included, until a page's own template changes
+        self.assertEqual(generate_pages_incremental(pages, self.template, current)[1], [])
+        self.write(os.path.join(self.directory.name, "post.html"), "<h1>{{ Title }}</h1>{{ Content }}")
+        _, results = generate_pages_incremental(pages, self.template, current)
+
+        self.assertEqual([result.from_path for result in results], [os.path.join(self.content, "blog", "hello.md")])
+
+        # Publishing drafts renders them, and taking them back down removes the output
+        current, _ = generate_pages_incremental(pages, self.template, current, options=RenderOptions(drafts=True))
+        self.assertEqual(self.read(wip), "<title>Not yet</title><main><div><h1>Not yet</h1></div></main>")
+        generate_pages_incremental(pages, self.template, current)
+        self.assertFalse(os.path.exists(wip))
+
+if __name__ == "__main__":
+    unittest.main()
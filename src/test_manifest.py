@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+from manifest import empty_manifest, load_manifest, removed_outputs, save_manifest, stale_pages
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, "index.html")
+
+        with open(self.output, "w") as f:
+            f.write("<p>hi</p>")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def manifest(self, pages, template="t1", generator="g1", asset_urls={}, metadata={}, drafts=False):
+        return {
+            "generator": generator,
+            "template": template,
+            "pages": pages,
+            "assets": [],
+            "links": {},
+            "search": {},
+            "asset_index": {},
+            "fingerprinted_urls": {},
+            "asset_urls": asset_urls,
+            "image_sizes": {},
+            "minify": False,
+            "drafts": drafts,
+            "metadata": metadata,
+            "listings": {},
+        }
+
+    def test_stale_pages(self):
+        missing = os.path.join(self.directory.name, "missing.html")
+        previous = self.manifest({
+            "content/index.md": {"source": "a", "output": self.output},
+            "content/other.md": {"source": "b", "output": self.output},
+            "content/gone.md": {"source": "c", "output": missing},
+        })
+
+        stale_cases = [
+            # Nothing changed
+            (
+                self.manifest({"content/index.md": {"source": "a", "output": self.output}}),
+                [],
+            ),
+            # Source changed
+            (
+                self.manifest({"content/index.md": {"source": "z", "output": self.output}}),
+                ["content/index.md"],
+            ),
+            # New page
+            (
+                self.manifest({"content/new.md": {"source": "a", "output": self.output}}),
+                ["content/new.md"],
+            ),
+            # Output deleted behind our back
+            (
+                self.manifest({"content/gone.md": {"source": "c", "output": missing}}),
+                ["content/gone.md"],
+            ),
+            # Template changed
+            (
+                self.manifest({"content/index.md": {"source": "a", "output": self.output}}, template="t2"),
+                ["content/index.md"],
+            ),
+            # Generator changed
+            (
+                self.manifest({"content/index.md": {"source": "a", "output": self.output}}, generator="g2"),
+                ["content/index.md"],
+            ),
+            # A referenced asset got a new fingerprint
+            (
+                self.manifest(
+                    {"content/index.md": {"source": "a", "output": self.output}},
+                    asset_urls={"/index.css": "/index.0123456789ab.css"},
+                ),
+                ["content/index.md"],
+            ),
+        ]
+
+        for current, expected in stale_cases:
+            self.assertEqual(stale_pages(previous, current), expected)
+
+    def test_stale_pages_drafts(self):
+        missing = os.path.join(self.directory.name, "missing.html")
+        pages = {"content/draft.md": {"source": "a", "output": missing}}
+        previous = self.manifest(pages, metadata={"content/draft.md": {"draft": True}})
+
+        # An unchanged draft has no output and is left alone, until drafts are rendered
+        self.assertEqual(stale_pages(previous, self.manifest(pages)), [])
+        self.assertEqual(stale_pages(previous, self.manifest(pages, drafts=True)), ["content/draft.md"])
+
+    def test_removed_outputs(self):
+        previous = self.manifest({
+            "content/index.md": {"source": "a", "output": "public/index.html"},
+            "content/old.md": {"source": "b", "output": "public/old.html"},
+        })
+        current = self.manifest({
+            "content/index.md": {"source": "a", "output": "public/index.html"},
+        })
+
+        self.assertEqual(removed_outputs(previous, current), ["public/old.html"])
+
+    def test_load_manifest(self):
+        path = os.path.join(self.directory.name, "cache", "manifest.json")
+
+        self.assertEqual(load_manifest(path), empty_manifest())
+
+        manifest = self.manifest({"content/index.md": {"source": "a", "output": self.output}})
+        save_manifest(path, manifest)
+
+        self.assertEqual(load_manifest(path), manifest)
+
+        with open(path, "w") as f:
+            f.write("{ not json")
+
+        self.assertEqual(load_manifest(path), empty_manifest())
+
+if __name__ == "__main__":
+    unittest.main()
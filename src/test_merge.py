@@ -0,0 +1,50 @@
+import contextlib
+import json
+import os
+import tempfile
+import unittest
+
+from main import main as build
+from merge import main as merge
+
+class TestMerge(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.write("template.html", "<title>{{ Title }}</title><main>{{ Content }}</main>")
+
+        for name in ["index", "one", "two", "three"]:
+            self.write(os.path.join("content", f"{name}.md"), f"# {name}\n\nSome text about {name}")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, path, text):
+        path = os.path.join(self.directory.name, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_merge_records_compressed_siblings(self):
+        with contextlib.chdir(self.directory.name), contextlib.redirect_stdout(None):
+            for shard in ["1/2", "2/2"]:
+                build(["--shard", shard, "--precompress", "--jobs", "1"])
+
+            merge(["--precompress", "--listings", "--jobs", "1"])
+
+            with open(os.path.join(".cache", "deploy-manifest.json"), "r") as f:
+                added = json.load(f)["added"]
+
+            # What merge writes and compresses is deployed along with every shard's pages
+            for path in [
+                os.path.join("all", "index.html"),
+                os.path.join("all", "index.html.gz"),
+                os.path.join("_search", "documents.json.gz"),
+                "one.html",
+                "one.html.gz",
+            ]:
+                self.assertIn(path, added)
+                self.assertTrue(os.path.exists(os.path.join("public", path)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,20 @@
+import io
 import unittest
 
+from blocktoken import BlockToken
 from htmlnode import LeafNode
 from textnode import TextNode, TextType
 from orchestration import (
     block_to_block_type,
     extract_title,
+    iter_blocks,
     markdown_to_blocks,
     markdown_to_html_node,
     split_nodes_delimiter,
     split_nodes_with_source,
     text_node_to_html_node,
     text_to_textnodes,
+    tokenize_block,
 )
 
 class TestOrchestration(unittest.TestCase):
@@ -272,7 +276,44 @@ class TestOrchestration(unittest.TestCase):
         (
             "",
             []
-        )
+        ),
+        (
+            "[Back Home](/) and ![a map](/map.png)",
+            [
+                TextNode("Back Home", TextType.LINK, "/"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("a map", TextType.IMAGE, "/map.png"),
+            ]
+        ),
+        (
+            "**bold\nacross lines** then `x * y`",
+            [
+                TextNode("bold\nacross lines", TextType.BOLD),
+                TextNode(" then ", TextType.TEXT),
+                TextNode("x * y", TextType.CODE),
+            ]
+        ),
+        (
+            "Some *text",
+            "ValueError('Unbalanced inline markdown node')"
+        ),
+        (
+            "Some `code",
+            "ValueError('Unbalanced inline markdown node')"
+        ),
+        # Empty emphasis is a stray delimiter, not an empty <i> or <b>
+        (
+            "a ** b",
+            "ValueError('Unbalanced inline markdown node')"
+        ),
+        (
+            "****",
+            "ValueError('Unbalanced inline markdown node')"
+        ),
+        (
+            "Some **bold",
+            "ValueError('Unbalanced inline markdown node')"
+        ),
     ]
 
     def test_text_to_textnodes(self):
@@ -303,7 +344,27 @@ This is a paragraph of text. It has some **bold** and *italic* words inside of i
         )
     ]
 
-    def test_split_nodes_with_source(self):
+    iter_blocks_cases = [
+        (
+            "# Title\n\n```python\ndef a():\n\n\n    pass\n```\n\n\n\nAfter the code",
+            ["# Title", "```python\ndef a():\n\n\n    pass\n```", "After the code"],
+        ),
+        (
+            "A paragraph with ```inline``` fences\n\nNext",
+            ["A paragraph with ```inline``` fences", "Next"],
+        ),
+        (
+            "",
+            [],
+        ),
+    ]
+
+    def test_iter_blocks(self):
+        for doc, blocks in self.iter_blocks_cases:
+            self.assertEqual(list(iter_blocks(io.StringIO(doc))), blocks)
+            self.assertEqual(markdown_to_blocks(doc), blocks)
+
+    def test_markdown_to_blocks(self):
         for doc, blocks in self.markdown_to_blocks_cases:
             try:
                 result = markdown_to_blocks(doc)
@@ -375,7 +436,7 @@ end
         )
     ]
 
-    def test_split_nodes_with_source(self):
+    def test_block_to_block_type(self):
         for block, expected_block_type in self.block_to_block_type_cases:
             try:
                 result = block_to_block_type(block)
@@ -384,6 +445,25 @@ end
 
             self.assertEqual(result, expected_block_type)
 
+    tokenize_block_cases = [
+        ("### A **bold** heading", BlockToken("heading", "A **bold** heading", level=3)),
+        ("####### Too deep", BlockToken("paragraph", "####### Too deep")),
+        ("#hashtag", BlockToken("paragraph", "#hashtag")),
+        ("```ruby\nputs 1\n```", BlockToken("code", "\nputs 1\n", language="ruby")),
+        ("```\n```", BlockToken("code", "\n")),
+        ("```never closed", BlockToken("paragraph", "```never closed")),
+        ("> a -> b\n> c", BlockToken("quote", "a -> b\n c")),
+        ("- one\n* two", BlockToken("unordered_list", ["one", "two"])),
+        ("*emphasis* first", BlockToken("paragraph", "*emphasis* first")),
+        ("1. one\n2. two", BlockToken("ordered_list", ["one", "two"])),
+        ("1999 was a year", BlockToken("paragraph", "1999 was a year")),
+        ("", BlockToken("paragraph", "")),
+    ]
+
+    def test_tokenize_block(self):
+        for block, expected_token in self.tokenize_block_cases:
+            self.assertEqual(tokenize_block(block), expected_token)
+
     markdown_to_html_node_cases = [
         (
 """
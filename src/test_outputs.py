@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import unittest
+
+from outputs import OutputChanges, save_changes, write_if_changed
+from sync import list_files, sync_tree
+
+class TestOutputs(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.directory.name, "public")
+        self.page = os.path.join(self.public, "blog", "index.html")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_write_if_changed(self):
+        self.assertEqual(write_if_changed(self.page, lambda f: f.write("<p>one</p>")), "added")
+
+        os.utime(self.page, ns=(0, 0))
+
+        self.assertEqual(write_if_changed(self.page, lambda f: f.write("<p>one</p>")), "unchanged")
+        self.assertEqual(os.stat(self.page).st_mtime_ns, 0)
+        self.assertEqual(write_if_changed(self.page, lambda f: f.write("<p>two</p>")), "changed")
+        self.assertEqual(list_files(self.public), [os.path.join("blog", "index.html")])
+
+    def test_write_if_changed_failure_keeps_previous_output(self):
+        write_if_changed(self.page, lambda f: f.write("<p>one</p>"))
+
+        def fail(f):
+            f.write("<p>half")
+            raise ValueError("Must have children")
+
+        with self.assertRaises(ValueError):
+            write_if_changed(self.page, fail)
+
+        with open(self.page) as f:
+            self.assertEqual(f.read(), "<p>one</p>")
+
+        self.assertEqual(list_files(self.public), [os.path.join("blog", "index.html")])
+
+    def test_changes_and_sweep(self):
+        static = os.path.join(self.directory.name, "static")
+        self.write(os.path.join(static, "index.css"), "body {}")
+        self.write(os.path.join(self.public, "index.css"), "body {}")
+        self.write(os.path.join(self.public, "stale", "old.html"), "<p>old</p>")
+
+        changes = OutputChanges(self.public)
+        sync_tree(static, self.public, changes=changes)
+        changes.record(self.page, write_if_changed(self.page, lambda f: f.write("<p>new</p>")))
+        changes.sweep(list_files(self.public))
+
+        self.assertEqual(
+            changes.to_dict(),
+            {
+                "added": [os.path.join("blog", "index.html")],
+                "changed": [],
+                "removed": [os.path.join("stale", "old.html")],
+            }
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.public, "stale")))
+
+        path = os.path.join(self.directory.name, "deploy.json")
+        save_changes(path, changes)
+
+        with open(path) as f:
+            self.assertEqual(json.load(f), changes.to_dict())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from profiling import NO_PROFILE, PageProfile, build_report, count_nodes
+
+class TestProfiling(unittest.TestCase):
+    def profile(self, path, stages, nodes, bytes_out):
+        profile = PageProfile(path)
+        profile.stages = stages
+        profile.nodes = nodes
+        profile.bytes_out = bytes_out
+
+        return profile
+
+    def test_stage_accumulates(self):
+        profile = PageProfile("content/index.md")
+
+        with profile.stage("read"):
+            pass
+
+        first = profile.stages["read"]
+
+        with profile.stage("read"):
+            pass
+
+        self.assertGreaterEqual(profile.stages["read"], first)
+        self.assertEqual(list(profile.stages), ["read"])
+
+    def test_null_profile(self):
+        with NO_PROFILE.stage("read"):
+            pass
+
+        self.assertFalse(NO_PROFILE.enabled)
+
+    def test_count_nodes(self):
+        tree = ParentNode("div", [ParentNode("p", [LeafNode(None, "a"), LeafNode("b", "b")])])
+
+        self.assertEqual(count_nodes(tree), 4)
+
+    def test_build_report(self):
+        report = build_report([
+            self.profile("fast.md", {"read": 0.1, "write": 0.1}, 10, 100),
+            self.profile("slow.md", {"read": 0.2, "parse_inline": 1.0}, 50, 400),
+        ])
+
+        self.assertEqual([page["path"] for page in report["pages"]], ["slow.md", "fast.md"])
+        self.assertAlmostEqual(report["stages"]["read"], 0.3)
+        self.assertAlmostEqual(report["stages"]["parse_inline"], 1.0)
+        self.assertEqual(report["stages"]["serialize"], 0.0)
+        self.assertAlmostEqual(report["total"], 1.4)
+        self.assertEqual(report["nodes"], 60)
+        self.assertEqual(report["bytes_out"], 500)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from blockcache import BlockCache
+from htmlnode import LeafNode, ParentNode
+from orchestration import blocks_to_html_node
+from references import AssetReferences
+from template import Template
+
+class TestReferences(unittest.TestCase):
+    def setUp(self):
+        self.references = AssetReferences(
+            "public",
+            {"/index.css": "/index.1.css", "/images/a.png": "/images/a.2.png"},
+            {"/images/a.png": [640, 480]},
+        )
+        self.page = self.references.for_page(os.path.join("public", "blog", "index.html"))
+
+    def test_rewrite(self):
+        rewrite_cases = [
+            ('<link href="/index.css">', '<link href="/index.1.css">'),
+            ('<link href=/index.css rel=stylesheet>', '<link href=/index.1.css rel=stylesheet>'),
+            ('<img src="../images/a.png" alt="a > b">', '<img src="/images/a.2.png" alt="a > b" width="640" height="480">'),
+            ('<img src=/images/a.png alt="">', '<img src=/images/a.2.png alt="" width="640" height="480">'),
+            ('<img src="/images/a.png" width="10">', '<img src="/images/a.2.png" width="10">'),
+            ('<img src="/images/b.png">', '<img src="/images/b.png">'),
+            ('<a href="/images/a.png#top">', '<a href="/images/a.2.png#top">'),
+            ('<a href="/blog/">', '<a href="/blog/">'),
+            ('<a href="https://example.com/index.css">', '<a href="https://example.com/index.css">'),
+        ]
+
+        for html, expected in rewrite_cases:
+            self.assertEqual(self.page.rewrite(html), expected)
+
+    def test_rewrite_node_leaves_text_alone(self):
+        node = ParentNode("div", [
+            ParentNode("p", [
+                LeafNode(None, 'Write href="/index.css" to link it: '),
+                LeafNode("code", 'src="/images/a.png"'),
+                LeafNode("img", "", {"src": "../images/a.png", "alt": "a"}),
+            ]),
+            LeafNode("pre", '<img src="/images/a.png">'),
+            LeafNode("a", "Top", {"href": "/images/a.png#top"}),
+        ])
+
+        self.assertEqual(
+            self.page.rewrite_node(node).to_html(),
+            '<div><p>Write href="/index.css" to link it: <code>src="/images/a.png"</code>'
+            '<img src="/images/a.2.png" alt="a" width="640" height="480"></img></p>'
+            '<pre><img src="/images/a.png"></pre><a href="/images/a.2.png#top">Top</a></div>',
+        )
+
+    def test_template_slot_in_attribute(self):
+        # A value inside a tag reaches rewrite with the tag around it, and one in text is left alone
+        template = Template(
+            ['<title>', '</title><link href="', '"><img alt="', '" src="', '">', ""],
+            ["Title", "Style", "Alt", "Image", "Content"],
+            [],
+        )
+        values = {
+            "Title": 'Use href="/index.css" here',
+            "Style": "/index.css",
+            "Alt": "a",
+            "Image": "/images/a.png",
+            "Content": LeafNode("code", 'href="/index.css"'),
+        }
+
+        self.assertEqual(template.tag_slots, {1, 2, 3})
+        self.assertEqual(
+            template.render(values, self.page.rewrite),
+            '<title>Use href="/index.css" here</title><link href="/index.1.css">'
+            '<img alt="a" src="/images/a.2.png" width="640" height="480"><code>href="/index.css"</code>',
+        )
+
+    def test_cached_fragments_are_rewritten(self):
+        blocks = ["![a](/images/a.png)", "```\n![a](/images/a.png)\n```"]
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = BlockCache(directory, 1024 * 1024, "v1", min_block_size=0)
+
+            # The first build fills the cache and the second is served from it
+            for _ in range(2):
+                self.assertEqual(
+                    blocks_to_html_node(blocks, cache=cache, references=self.page).to_html(),
+                    '<div><p><img src="/images/a.2.png" alt="a" width="640" height="480"></img></p>'
+                    '<pre><code>\n![a](/images/a.png)\n</code></pre></div>',
+                )
+
+    def test_no_references_leave_output_alone(self):
+        references = AssetReferences("public").for_page(os.path.join("public", "index.html"))
+        node = LeafNode("img", "", {"src": "/a.png"})
+
+        self.assertFalse(references)
+        self.assertIs(references.rewrite_node(node), node)
+        self.assertEqual(references.rewrite('<img src="/a.png">'), '<img src="/a.png">')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import unittest
+
+from compress import precompress_tree
+from orchestration import markdown_to_html_node
+from outputs import OutputChanges
+from pageindex import PageIndex, tokenize
+from search import build_search_index, shard_name, write_search_index
+from sync import list_files
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.search = os.path.join(self.directory.name, "public", "_search")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    tokenize_cases = [
+        ("Hello, World!", ["hello", "world"]),
+        ("a b cd", ["cd"]),
+        ("Élan vital_force 42", ["élan", "vital_force", "42"]),
+    ]
+
+    def test_tokenize(self):
+        for text, expected in self.tokenize_cases:
+            self.assertEqual(tokenize(text), expected)
+
+    def test_index_collects_terms_while_rendering(self):
+        index = PageIndex()
+        markdown_to_html_node("# Rivendell\n\nThe **last** homely house\n\n- house\n- elves", index=index)
+
+        self.assertEqual(
+            index.terms,
+            {"rivendell": 1, "the": 1, "last": 1, "homely": 1, "house": 2, "elves": 1}
+        )
+
+    def test_build_search_index(self):
+        documents, shards = build_search_index([
+            ("/", "Home", {"house": 1, "home": 2}),
+            ("/majesty/", "Majesty", {"house": 3, "elves": 1}),
+        ])
+
+        self.assertEqual(documents, [{"url": "/", "title": "Home"}, {"url": "/majesty/", "title": "Majesty"}])
+        self.assertEqual(shard_name("house"), "686f")
+        self.assertEqual(
+            shards,
+            {
+                "686f": {"house": [[0, 1], [1, 3]], "home": [[0, 2]]},
+                "656c": {"elves": [[1, 1]]},
+            }
+        )
+
+    def test_write_search_index(self):
+        documents, shards = build_search_index([("/", "Home", {"house": 1, "elves": 1})])
+        write_search_index(self.search, documents, shards)
+
+        with open(os.path.join(self.search, "terms", "686f.json")) as f:
+            self.assertEqual(json.load(f), {"house": [[0, 1]]})
+
+        # Shards that no longer have terms are removed, unchanged ones left alone
+        documents, shards = build_search_index([("/", "Home", {"house": 1})])
+        changes = OutputChanges(self.search)
+        write_search_index(self.search, documents, shards, changes)
+
+        self.assertEqual(list_files(self.search), ["documents.json", os.path.join("terms", "686f.json")])
+        self.assertEqual(changes.to_dict(), {"added": [], "changed": [], "removed": [os.path.join("terms", "656c.json")]})
+
+    def test_write_search_index_keeps_compressed_siblings(self):
+        documents, shards = build_search_index([("/", "Home", {"house": 1, "elves": 1})])
+
+        for build in range(2):
+            changes = OutputChanges(self.search)
+            write_search_index(self.search, documents, shards, changes)
+            precompress_tree(self.search, list_files(self.search), changes=changes)
+
+        # An identical rebuild neither removes nor rewrites a single file
+        self.assertIn(os.path.join("terms", "686f.json.gz"), list_files(self.search))
+        self.assertEqual(changes.to_dict(), {"added": [], "changed": [], "removed": []})
+
+        # Siblings of a shard that is gone go with it
+        documents, shards = build_search_index([("/", "Home", {"house": 1})])
+        write_search_index(self.search, documents, shards)
+
+        self.assertNotIn(os.path.join("terms", "656c.json.gz"), list_files(self.search))
+
+if __name__ == "__main__":
+    unittest.main()
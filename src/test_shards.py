@@ -0,0 +1,100 @@
+import os
+import unittest
+
+from outputs import OutputChanges
+from shards import INDEX_KEYS, SHARED_KEYS, merge_changes, merge_shards, parse_shard, shard_manifest, shard_of
+
+def shard(index, count, pages, outputs, removed=(), **shared):
+    current = {key: shared.get(key) for key in SHARED_KEYS + INDEX_KEYS}
+    current.update({
+        "pages": {from_path: {"source": "x", "output": output} for from_path, output in pages.items()},
+        "metadata": {from_path: {"title": from_path} for from_path in pages},
+        "links": {from_path: [] for from_path in pages},
+        "search": {from_path: {"title": from_path, "terms": {}} for from_path in pages},
+        "assets": [],
+    })
+
+    changes = {**dict.fromkeys(outputs, "added"), **dict.fromkeys(removed, "removed")}
+
+    return shard_manifest((index, count), current, changes)
+
+class TestShards(unittest.TestCase):
+    parse_cases = [
+        ("1/1", (1, 1)),
+        ("2/4", (2, 4)),
+        ("4/4", (4, 4)),
+    ]
+
+    def test_parse_shard(self):
+        for value, expected in self.parse_cases:
+            self.assertEqual(parse_shard(value), expected)
+
+    def test_parse_shard_rejects_invalid(self):
+        for value in ["0/4", "5/4", "1", "1/0", "a/b", "-1/4"]:
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_shard_of_is_stable_and_covers_every_path(self):
+        paths = [os.path.join("content", f"page-{n}.md") for n in range(200)]
+        assigned = [shard_of(path, 4) for path in paths]
+
+        self.assertEqual(assigned, [shard_of(path, 4) for path in paths])
+        self.assertEqual(set(assigned), {1, 2, 3, 4})
+        # The split depends on the path alone, never on the OS separator
+        self.assertEqual(shard_of("content/blog/post.md", 4), shard_of(os.path.join("content", "blog", "post.md"), 4))
+
+    def test_merge_shards(self):
+        merged = merge_shards([
+            shard(2, 2, {"content/b.md": "public/b.html"}, ["b.html"], template="t"),
+            shard(1, 2, {"content/a.md": "public/a.html"}, ["a.html", "index.css"], template="t"),
+        ])
+
+        self.assertEqual(merged["template"], "t")
+        self.assertEqual(sorted(merged["pages"]), ["content/a.md", "content/b.md"])
+        self.assertEqual(sorted(merged["search"]), ["content/a.md", "content/b.md"])
+
+    def test_merge_shards_rejects_missing_or_repeated_shards(self):
+        for manifests in [
+            [shard(1, 3, {}, []), shard(2, 3, {}, [])],
+            [shard(1, 2, {}, []), shard(1, 2, {}, [])],
+            [shard(1, 2, {}, []), shard(2, 3, {}, [])],
+        ]:
+            with self.assertRaises(ValueError):
+                merge_shards(manifests)
+
+    def test_merge_shards_rejects_collisions(self):
+        with self.assertRaisesRegex(ValueError, "index.css: outputs of shards 1/2 and 2/2"):
+            merge_shards([
+                shard(1, 2, {"content/a.md": "public/a.html"}, ["a.html", "index.css"]),
+                shard(2, 2, {"content/b.md": "public/b.html"}, ["b.html", "index.css"]),
+            ])
+
+    def test_merge_shards_checks_sources_and_outputs_apart(self):
+        # A static file that happens to share its name with another shard's source is no collision
+        merged = merge_shards([
+            shard(1, 2, {"content/a.md": "public/a.html"}, ["a.html"]),
+            shard(2, 2, {}, ["content/a.md"]),
+        ])
+
+        self.assertEqual(sorted(merged["pages"]), ["content/a.md"])
+
+    def test_merge_changes(self):
+        manifests = [
+            shard(1, 2, {}, ["a.html", "b.html"], removed=["old.html"]),
+            shard(2, 2, {}, ["c.html"], removed=["b.html"]),
+        ]
+        changes = OutputChanges("public")
+        changes.record("public/all/index.html", "unchanged")
+        merge_changes(manifests, changes)
+
+        self.assertEqual(
+            changes.to_dict(),
+            {"added": ["a.html", "b.html", "c.html"], "changed": [], "removed": ["old.html"]},
+        )
+
+    def test_merge_shards_rejects_different_inputs(self):
+        with self.assertRaisesRegex(ValueError, "template"):
+            merge_shards([shard(1, 2, {}, [], template="t"), shard(2, 2, {}, [], template="u")])
+
+if __name__ == "__main__":
+    unittest.main()
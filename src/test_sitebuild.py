@@ -0,0 +1,44 @@
+import struct
+import unittest
+
+from sitebuild import build_site
+from vfs import MemoryFileSystem
+
+class TestSiteBuild(unittest.TestCase):
+    def source(self, **files):
+        png = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 4, 2) + b"\x08\x02\x00\x00\x00"
+
+        return MemoryFileSystem({
+            "template.html": b"<title>{{ Title }}</title>\n  {{> footer }}\n<main>{{ Content }}</main>",
+            "partials/footer.html": b"<footer>fin</footer>",
+            "content/index.md": b"# Home\n\n[Post](/blog/post.html) ![Logo](/images/logo.png)",
+            "content/blog/post.md": b"# Post\n\n[Home](/) [Gone](/gone)",
+            "content/blog/.post.md.swp": b"swap",
+            "static/images/logo.png": png,
+            **files,
+        })
+
+    def test_build_site_in_memory(self):
+        sink = MemoryFileSystem()
+        broken = build_site(self.source(), sink)
+
+        self.assertEqual(sorted(sink.files), ["blog/post.html", "images/logo.png", "index.html"])
+        self.assertEqual(
+            sink.read_text("index.html"),
+            '<title>Home</title>\n  <footer>fin</footer>\n<main><div><h1>Home</h1><p><a href="/blog/post.html">Post</a> '
+            '<img src="/images/logo.png" alt="Logo" width="4" height="2"></img></p></div></main>'
+        )
+        self.assertEqual(broken, [("content/blog/post.md", "/gone")])
+
+    def test_build_site_minified(self):
+        sink = MemoryFileSystem()
+        build_site(self.source(), sink, minify=True)
+
+        self.assertEqual(sink.read_text("blog/post.html"), '<title>Post</title><footer>fin</footer><main><div><h1>Post</h1><p><a href=/>Home</a> <a href=/gone>Gone</a></p></div></main>')
+
+    def test_build_site_reports_failures(self):
+        with self.assertRaisesRegex(ValueError, "1 page\\(s\\) failed"):
+            build_site(self.source(**{"content/untitled.md": b"no title"}), MemoryFileSystem())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import sync
+from outputs import OutputChanges
+from sync import is_unchanged, list_files, sync_tree
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.directory.name, "static")
+        self.public = os.path.join(self.directory.name, "public")
+
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "deeply", "nested", "logo.png"), "png")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_sync_tree_copies_nested_files(self):
+        files = sync_tree(self.static, self.public)
+
+        self.assertEqual(files, [os.path.join("images", "deeply", "nested", "logo.png"), "index.css"])
+        self.assertEqual(list_files(self.public), files)
+
+    def test_sync_tree_only_copies_changes(self):
+        files = sync_tree(self.static, self.public)
+        css = os.path.join(self.public, "index.css")
+        logo = os.path.join(self.public, "images", "deeply", "nested", "logo.png")
+        logo_mtime = os.stat(logo).st_mtime_ns
+
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        sync_tree(self.static, self.public, files)
+
+        with open(css) as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+
+        self.assertEqual(os.stat(logo).st_mtime_ns, logo_mtime)
+
+    def test_sync_tree_touched_file_is_hashed_once(self):
+        files = sync_tree(self.static, self.public)
+        source = os.path.join(self.static, "index.css")
+        css = os.path.join(self.public, "index.css")
+        os.utime(source, ns=(0, 1_000_000_000))
+
+        with mock.patch.object(sync, "hash_file", wraps=sync.hash_file) as hash_file:
+            sync_tree(self.static, self.public, files)
+            self.assertEqual(hash_file.call_count, 2)
+
+            # The copy now carries the source's mtime, so a rebuild needs no hashing
+            self.assertEqual(os.stat(css).st_mtime_ns, 1_000_000_000)
+            sync_tree(self.static, self.public, files)
+            self.assertEqual(hash_file.call_count, 2)
+
+    def test_sync_tree_skips_linked_duplicates(self):
+        self.write(os.path.join(self.static, "copy.css"), "body {}")
+        os.utime(os.path.join(self.static, "copy.css"), ns=(0, 1_000_000_000))
+        files = sync_tree(self.static, self.public)
+        css = os.path.join(self.public, "index.css")
+        copy = os.path.join(self.public, "copy.css")
+        os.link(css, f"{copy}.link")
+        os.replace(f"{copy}.link", copy)
+        mtime = os.stat(css).st_mtime_ns
+        changes = OutputChanges(self.public)
+
+        # Neither file is hashed, and the inode they share keeps the canonical's mtime
+        with mock.patch.object(sync, "hash_file", wraps=sync.hash_file) as hash_file:
+            for _ in range(2):
+                sync_tree(self.static, self.public, files, changes=changes, linked={"copy.css": "index.css"})
+
+            self.assertEqual(hash_file.call_count, 0)
+
+        self.assertTrue(os.path.samefile(css, copy))
+        self.assertEqual(os.stat(css).st_mtime_ns, mtime)
+        self.assertEqual(changes.statuses["copy.css"], "unchanged")
+
+    def test_sync_tree_removes_stale_files(self):
+        files = sync_tree(self.static, self.public)
+        self.write(os.path.join(self.public, "index.html"), "<p>generated</p>")
+
+        os.remove(os.path.join(self.static, "images", "deeply", "nested", "logo.png"))
+        sync_tree(self.static, self.public, files)
+
+        self.assertEqual(list_files(self.public), ["index.css", "index.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+
+    def test_sync_tree_hardlinks(self):
+        sync_tree(self.static, self.public, link_mode="hardlink")
+        source = os.stat(os.path.join(self.static, "index.css"))
+        destination = os.stat(os.path.join(self.public, "index.css"))
+
+        self.assertEqual(source.st_ino, destination.st_ino)
+
+    def test_sync_tree_reflink_falls_back_to_copy(self):
+        sync_tree(self.static, self.public, link_mode="reflink")
+
+        with open(os.path.join(self.public, "index.css")) as f:
+            self.assertEqual(f.read(), "body {}")
+
+    def test_is_unchanged_with_checksum(self):
+        sync_tree(self.static, self.public)
+        source = os.path.join(self.static, "index.css")
+        destination = os.path.join(self.public, "index.css")
+        stat = os.stat(destination)
+
+        # Same size and mtime but different bytes is only caught by a checksum
+        self.write(destination, "body []")
+        os.utime(destination, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertTrue(is_unchanged(source, destination))
+        self.assertFalse(is_unchanged(source, destination, checksum=True))
+
+if __name__ == "__main__":
+    unittest.main()
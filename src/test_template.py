@@ -0,0 +1,86 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import compile_template, hash_template, load_template
+
+class TestTemplate(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.template = os.path.join(self.directory.name, "template.html")
+
+        self.write(self.template, "<title>{{ Title }}</title>{{> header }}<main>{{Content}}</main>")
+        self.write(os.path.join(self.directory.name, "partials", "header.html"), "<h1>{{ Title }}</h1><p>{{ date }}</p>")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_compile_template(self):
+        template = compile_template(self.template)
+
+        self.assertEqual(template.segments, ["<title>", "</title><h1>", "</h1><p>", "</p><main>", "</main>"])
+        self.assertEqual(template.slots, ["Title", "Title", "date", "Content"])
+        self.assertEqual(
+            template.dependencies,
+            [self.template, os.path.join(self.directory.name, "partials", "header.html")]
+        )
+
+    def test_render_to(self):
+        template = compile_template(self.template)
+        content = ParentNode("div", [LeafNode("b", "Bold")])
+        f = io.StringIO()
+
+        template.render_to(f, {"Title": "Home", "Content": content})
+
+        self.assertEqual(f.getvalue(), "<title>Home</title><h1>Home</h1><p></p><main><div><b>Bold</b></div></main>")
+        self.assertEqual(template.render({"Title": "Home", "Content": content}), f.getvalue())
+
+    def test_minified(self):
+        self.write(
+            self.template,
+            '<!DOCTYPE html>\n<html>\n<head>\n  <title> {{ Title }} </title>\n  <link href="/index.css" rel="stylesheet">\n</head>\n'
+            '<body>\n  <p>A  <b>b</b> "c"</p>\n  <pre class="a b">\n  {{ Title }}\n  </pre>\n  <article>\n    {{ Content }}\n  </article>\n</body>\n</html>\n'
+        )
+        template = load_template(self.template, minify=True)
+        content = ParentNode("div", [LeafNode("a", "Home", {"href": "/"})])
+
+        self.assertIsNot(template, load_template(self.template))
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": content}),
+            '<!DOCTYPE html><html><head><title>Home</title><link href=/index.css rel=stylesheet></head>'
+            '<body><p>A <b>b</b> "c"</p><pre class="a b">\n  Home\n  </pre><article><div><a href=/>Home</a></div></article></body></html>'
+        )
+
+    def test_recursive_partial(self):
+        self.write(os.path.join(self.directory.name, "partials", "header.html"), "{{> header }}")
+
+        with self.assertRaises(ValueError):
+            compile_template(self.template)
+
+    def test_load_template_is_cached_until_a_dependency_changes(self):
+        template = load_template(self.template)
+        template_hash = hash_template(self.template)
+
+        self.assertIs(load_template(self.template), template)
+
+        partial = os.path.join(self.directory.name, "partials", "header.html")
+        self.write(partial, "<h2>{{ Title }}</h2>")
+        os.utime(partial, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+        reloaded = load_template(self.template)
+
+        self.assertIsNot(reloaded, template)
+        self.assertEqual(reloaded.segments[1], "</title><h2>")
+        self.assertNotEqual(hash_template(self.template), template_hash)
+
+if __name__ == "__main__":
+    unittest.main()
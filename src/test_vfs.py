@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from vfs import DiskFileSystem, MemoryFileSystem
+
+class TestVFS(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check_file_system(self, fs):
+        fs.write_text("content/blog/post.md", "# Post")
+        fs.write_bytes("content/index.md", b"# Home")
+        fs.write_text("static/index.css", "body {}")
+
+        self.assertEqual(fs.list_files("content"), ["blog/post.md", "index.md"])
+        self.assertEqual(fs.list_files("missing"), [])
+        self.assertEqual(fs.read_text("content/blog/post.md"), "# Post")
+        self.assertEqual(fs.read_bytes("content/index.md"), b"# Home")
+        self.assertTrue(fs.exists("static/index.css"))
+        self.assertFalse(fs.exists("static/missing.css"))
+
+        with self.assertRaises(FileNotFoundError):
+            fs.read_text("content/missing.md")
+
+    def test_memory_file_system(self):
+        fs = MemoryFileSystem({"./template.html": b"{{ Content }}"})
+        self.check_file_system(fs)
+
+        self.assertEqual(fs.read_text("template.html"), "{{ Content }}")
+        self.assertNotIn("content", fs.files)
+
+    def test_disk_file_system(self):
+        fs = DiskFileSystem(self.directory.name)
+        self.check_file_system(fs)
+
+        with open(os.path.join(self.directory.name, "content", "blog", "post.md")) as f:
+            self.assertEqual(f.read(), "# Post")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+
+from main import RenderOptions
+from references import AssetReferences
+from watch import ReloadNotifier, apply_rebuild, diff_snapshots, plan_rebuild, snapshot, watched_templates
+
+class TestWatch(unittest.TestCase):
+    def test_diff_snapshots(self):
+        previous = {"content/index.md": 1, "content/old.md": 1, "static/index.css": 1}
+        current = {"content/index.md": 2, "content/new.md": 1, "static/index.css": 1}
+
+        self.assertEqual(
+            diff_snapshots(previous, current),
+            ({"content/index.md", "content/new.md"}, {"content/old.md"})
+        )
+
+    def test_plan_rebuild_targets_affected_files(self):
+        plan = plan_rebuild(
+            {"content/blog/post.md", "static/images/logo.png"},
+            {"content/old.md", "static/old.css"},
+        )
+
+        self.assertEqual(
+            plan,
+            {
+                "pages": [("content/blog/post.md", os.path.join("public", "blog", "post.html"))],
+                "remove_pages": [os.path.join("public", "old.html")],
+                "assets": [os.path.join("images", "logo.png")],
+                "remove_assets": ["old.css"],
+            }
+        )
+
+    def test_plan_rebuild_template_change_renders_every_page(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            template = os.path.join(directory, "template.html")
+            os.makedirs(os.path.join(content, "blog"))
+
+            for path in ["index.md", os.path.join("blog", "post.md")]:
+                with open(os.path.join(content, path), "w") as f:
+                    f.write("# Title")
+
+            plan = plan_rebuild({template}, set(), content_dir=content, template_paths=[template], public_dir="public")
+
+            self.assertEqual(
+                plan["pages"],
+                [
+                    (os.path.join(content, "blog", "post.md"), os.path.join("public", "blog", "post.html")),
+                    (os.path.join(content, "index.md"), os.path.join("public", "index.html")),
+                ]
+            )
+
+    def test_ignored_files_are_not_watched_or_rebuilt(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            template = os.path.join(directory, "template.html")
+            ignore = ("drafts/*",)
+            os.makedirs(os.path.join(content, "drafts"))
+
+            for path in ["index.md", os.path.join("drafts", "x.md")]:
+                with open(os.path.join(content, path), "w") as f:
+                    f.write("# Title")
+
+            self.assertEqual(list(snapshot([content], ignore)), [os.path.join(content, "index.md")])
+
+            draft = os.path.join(content, "drafts", "x.md")
+            plan = plan_rebuild({draft}, {draft}, content_dir=content, public_dir="public", ignore=ignore)
+
+            self.assertEqual((plan["pages"], plan["remove_pages"]), ([], []))
+
+            # A template edit renders every page the build would, and no ignored one
+            plan = plan_rebuild({template}, set(), content_dir=content, template_paths=[template], public_dir="public", ignore=ignore)
+
+            self.assertEqual(plan["pages"], [(os.path.join(content, "index.md"), os.path.join("public", "index.html"))])
+
+    def test_watched_templates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            template = os.path.join(directory, "template.html")
+            wide = os.path.join(directory, "wide.html")
+            partial = os.path.join(directory, "partials", "nav.html")
+            os.makedirs(os.path.dirname(partial))
+
+            for path, text in [(template, "{{ Content }}"), (wide, "{{> nav }}{{ Content }}"), (partial, "<nav></nav>")]:
+                with open(path, "w") as f:
+                    f.write(text)
+
+            metadata = {
+                "content/index.md": {"template": None},
+                "content/wide.md": {"template": "wide.html"},
+                "content/new.md": {"template": "missing.html"},
+            }
+
+            # A named template that does not exist yet is watched for its creation
+            self.assertEqual(
+                watched_templates(metadata, template),
+                [os.path.join(directory, "missing.html"), template, wide, partial],
+            )
+
+    def test_apply_rebuild_renders_with_options(self):
+        with tempfile.TemporaryDirectory() as directory:
+            public = os.path.join(directory, "public")
+            template = os.path.join(directory, "template.html")
+            page = os.path.join(directory, "index.md")
+
+            with open(template, "w") as f:
+                f.write('<link href="/index.css">\n  {{ Content }}')
+
+            with open(page, "w") as f:
+                f.write("# Title")
+
+            options = RenderOptions(
+                asset_references=AssetReferences(public, {"/index.css": "/index.0123456789ab.css"}),
+                minify=True,
+            )
+            plan = {"pages": [(page, os.path.join(public, "index.html"))], "remove_pages": [], "assets": [], "remove_assets": []}
+            results = apply_rebuild(plan, template, public_dir=public, options=options)
+
+            with open(os.path.join(public, "index.html"), "r") as f:
+                self.assertEqual(f.read(), '<link href=/index.0123456789ab.css><div><h1>Title</h1></div>')
+
+            self.assertEqual(results[0].index.metadata["title"], "Title")
+
+    def test_reload_notifier(self):
+        notifier = ReloadNotifier()
+
+        self.assertEqual(notifier.wait(0, timeout=0), 0)
+
+        notifier.notify()
+
+        self.assertEqual(notifier.wait(0, timeout=0), 1)
+
+if __name__ == "__main__":
+    unittest.main()
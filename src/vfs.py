@@ -0,0 +1,73 @@
+import os
+import posixpath
+
+from discovery import scan_tree
+from outputs import write_if_changed
+
+def normalize(path) -> str:
+    return posixpath.normpath(path.replace(os.sep, "/"))
+
+class MemoryFileSystem():
+    __slots__ = ("files",)
+
+    def __init__(self, files: dict[str, bytes] | None = None) -> None:
+        # Relative POSIX path to contents; text is stored UTF-8 encoded
+        self.files = {normalize(path): data for path, data in (files or {}).items()}
+
+    def list_files(self, directory) -> list[str]:
+        prefix = normalize(directory) + "/"
+
+        return sorted(path.removeprefix(prefix) for path in self.files if path.startswith(prefix))
+
+    def exists(self, path) -> bool:
+        return normalize(path) in self.files
+
+    def read_bytes(self, path) -> bytes:
+        try:
+            return self.files[normalize(path)]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+    def read_text(self, path) -> str:
+        return self.read_bytes(path).decode()
+
+    def write_bytes(self, path, data: bytes):
+        self.files[normalize(path)] = data
+
+    def write_text(self, path, text):
+        self.write_bytes(path, text.encode())
+
+    def __repr__(self) -> str:
+        return f"MemoryFileSystem({sorted(self.files)})"
+
+class DiskFileSystem():
+    __slots__ = ("root",)
+
+    def __init__(self, root) -> None:
+        self.root = root
+
+    def path(self, path) -> str:
+        return os.path.join(self.root, path)
+
+    def list_files(self, directory) -> list[str]:
+        return sorted(entry.path.replace(os.sep, "/") for entry in scan_tree(self.path(directory), ignore=()))
+
+    def exists(self, path) -> bool:
+        return os.path.exists(self.path(path))
+
+    def read_bytes(self, path) -> bytes:
+        with open(self.path(path), "rb") as f:
+            return f.read()
+
+    def read_text(self, path) -> str:
+        with open(self.path(path), "r") as f:
+            return f.read()
+
+    def write_bytes(self, path, data: bytes):
+        write_if_changed(self.path(path), lambda f: f.write(data), "wb")
+
+    def write_text(self, path, text):
+        write_if_changed(self.path(path), lambda f: f.write(text))
+
+    def __repr__(self) -> str:
+        return f"DiskFileSystem({self.root})"
@@ -0,0 +1,279 @@
+import argparse
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from discovery import DEFAULT_IGNORE, is_ignored, scan_tree
+from main import MANIFEST_PATH, generate_pages, find_pages, main as build, page_failures, page_output_path, parse_args as parse_build_args, render_options
+from manifest import load_manifest
+from pagerender import page_template_path
+from references import AssetReferences
+from sync import remove_file, transfer
+from template import load_template
+
+CONTENT_DIR = "content"
+STATIC_DIR = "static"
+TEMPLATE_PATH = "template.html"
+PUBLIC_DIR = "public"
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = (
+    f'<script>new EventSource("{RELOAD_PATH}").onmessage = () => location.reload()</script>'
+).encode()
+
+def snapshot(paths, ignore=DEFAULT_IGNORE) -> dict:
+    files = {}
+
+    for path in paths:
+        if os.path.isfile(path):
+            files[path] = os.stat(path).st_mtime_ns
+        else:
+            # Swap and backup files written while editing, and whatever the build
+            # ignores, never trigger a rebuild
+            for entry in scan_tree(path, ignore):
+                files[os.path.join(path, entry.path)] = entry.stat.st_mtime_ns
+
+    return files
+
+def diff_snapshots(previous, current) -> tuple[set, set]:
+    changed = {path for path, mtime in current.items() if previous.get(path) != mtime}
+    removed = set(previous) - set(current)
+
+    return changed, removed
+
+def plan_rebuild(changed, removed, content_dir=CONTENT_DIR, static_dir=STATIC_DIR, template_paths=None, public_dir=PUBLIC_DIR, ignore=DEFAULT_IGNORE) -> dict:
+    def under(directory, path):
+        directory = os.path.abspath(directory)
+
+        if os.path.commonpath([directory, os.path.abspath(path)]) != directory:
+            return False
+
+        return not is_ignored(os.path.relpath(path, directory), ignore)
+
+    template_paths = template_paths or [TEMPLATE_PATH]
+    plan = {"pages": [], "remove_pages": [], "assets": [], "remove_assets": []}
+
+    # The template or any of its partials changing affects every page
+    if any(path in changed for path in template_paths):
+        plan["pages"] = find_pages(content_dir, public_dir, ignore)
+    else:
+        plan["pages"] = [
+            (path, page_output_path(path, content_dir, public_dir))
+            for path in sorted(changed)
+            if under(content_dir, path) and path.endswith(".md")
+        ]
+
+    plan["remove_pages"] = [
+        page_output_path(path, content_dir, public_dir)
+        for path in sorted(removed)
+        if under(content_dir, path) and path.endswith(".md")
+    ]
+    plan["assets"] = [os.path.relpath(path, static_dir) for path in sorted(changed) if under(static_dir, path)]
+    plan["remove_assets"] = [os.path.relpath(path, static_dir) for path in sorted(removed) if under(static_dir, path)]
+
+    return plan
+
+def watched_templates(metadata, template_path=TEMPLATE_PATH) -> list[str]:
+    # The site template and every template a page names, with their partials. One
+    # that fails to load is still watched, so fixing or creating it triggers a rebuild
+    paths = []
+
+    for path in sorted({template_path, *(page_template_path(template_path, page) for page in metadata.values())}):
+        try:
+            paths += load_template(path).dependencies
+        except (OSError, ValueError) as e:
+            print(f"Failed to load {path}: {e}")
+            paths.append(os.path.normpath(path))
+
+    return list(dict.fromkeys(paths))
+
+def asset_references(public_dir=PUBLIC_DIR) -> AssetReferences:
+    # The asset URLs and image sizes the last full build settled on
+    manifest = load_manifest(MANIFEST_PATH)
+
+    return AssetReferences(public_dir, manifest["asset_urls"], manifest["image_sizes"])
+
+def apply_rebuild(plan, template_path=TEMPLATE_PATH, static_dir=STATIC_DIR, public_dir=PUBLIC_DIR, jobs=1, options=None) -> list:
+    for path in plan["assets"]:
+        destination = os.path.join(public_dir, path)
+        print(f"Copying {os.path.join(static_dir, path)} to {destination}")
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        transfer(os.path.join(static_dir, path), destination)
+
+    for path in plan["remove_assets"]:
+        remove_file(public_dir, path)
+
+    for output in plan["remove_pages"]:
+        remove_file(public_dir, os.path.relpath(output, public_dir))
+
+    results = generate_pages(plan["pages"], template_path, jobs, options)
+
+    for from_path, error in page_failures(results):
+        print(f"Failed to generate {from_path}: {error}")
+
+    return results
+
+class ReloadNotifier():
+    def __init__(self) -> None:
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout) -> int:
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+
+            return self.version
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    def __init__(self, notifier, *args, **kwargs):
+        self.notifier = notifier
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            return self.stream_reloads()
+
+        path = self.translate_path(self.path)
+
+        if os.path.isdir(path):
+            # Let the base handler redirect "/majesty" to "/majesty/"
+            if not self.path.split("?")[0].endswith("/"):
+                return super().do_GET()
+
+            path = os.path.join(path, "index.html")
+
+        if path.endswith(".html") and os.path.isfile(path):
+            return self.send_html(path)
+
+        return super().do_GET()
+
+    def send_html(self, path):
+        with open(path, "rb") as f:
+            body = f.read()
+
+        # Injected when served rather than written to disk, so public/ stays deployable
+        body = body.replace(b"</body>", RELOAD_SCRIPT + b"</body>", 1)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reloads(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        version = self.notifier.version
+
+        try:
+            while True:
+                latest = self.notifier.wait(version, timeout=15)
+
+                if latest != version:
+                    version = latest
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def serve(notifier, port) -> ThreadingHTTPServer:
+    handler = partial(LiveReloadHandler, notifier, directory=PUBLIC_DIR)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving {PUBLIC_DIR} on http://localhost:{port}")
+
+    return server
+
+def run_build(argv):
+    try:
+        build(argv)
+    except ValueError as e:
+        print(e)
+
+def watch(interval, port, jobs, build_argv, build_args, options, ignore=DEFAULT_IGNORE):
+    notifier = ReloadNotifier()
+    serve(notifier, port)
+    metadata = load_manifest(MANIFEST_PATH)["metadata"]
+    template_paths = watched_templates(metadata)
+    watched = [CONTENT_DIR, STATIC_DIR, *template_paths]
+    previous = snapshot(watched, ignore)
+
+    print(f"Watching {', '.join(watched)} for changes")
+
+    while True:
+        time.sleep(interval)
+        current = snapshot(watched, ignore)
+        changed, removed = diff_snapshots(previous, current)
+        previous = current
+
+        if not changed and not removed:
+            continue
+
+        plan = plan_rebuild(changed, removed, template_paths=template_paths, ignore=ignore)
+        follows_assets = build_args.fingerprint or build_args.image_sizes or build_args.dedupe_images
+
+        # Fingerprints, image sizes and duplicate links follow the assets, so
+        # changing one goes through an incremental build of the whole site
+        if (plan["assets"] or plan["remove_assets"]) and follows_assets:
+            run_build(build_argv)
+            options.asset_references = asset_references()
+            metadata = load_manifest(MANIFEST_PATH)["metadata"]
+        else:
+            for result in apply_rebuild(plan, jobs=jobs, options=options):
+                if result.index.metadata:
+                    metadata[result.from_path] = result.index.metadata
+
+            for path in removed:
+                metadata.pop(path, None)
+
+        notifier.notify()
+
+        # A page may name another template, and a template edit may add or drop partials
+        template_paths = watched_templates(metadata)
+        previous.update(snapshot([path for path in template_paths if path not in watched], ignore))
+        watched = [CONTENT_DIR, STATIC_DIR, *template_paths]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rebuild the site on change and live reload open pages",
+        epilog="Any other arguments are passed on to main.py, and rebuilds render pages with the same options.",
+    )
+    parser.add_argument("--port", type=int, default=8888, help="port to serve public/ on")
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between filesystem polls")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes for template rebuilds")
+
+    return parser.parse_known_args(argv)
+
+def main(argv=None):
+    args, build_argv = parse_args(argv)
+    build_argv = ["--incremental", "--jobs", str(args.jobs), *build_argv]
+    build_args = parse_build_args(build_argv)
+    # The same files the build skips are neither watched nor rebuilt
+    ignore = (*DEFAULT_IGNORE, *build_args.ignore)
+    run_build(build_argv)
+    # Pages a change rebuilds render with the block cache, minification, drafts
+    # and asset URLs of the build
+    options = render_options(build_args, asset_references())
+
+    try:
+        watch(args.interval, args.port, args.jobs, build_argv, build_args, options, ignore)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()